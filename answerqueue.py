@@ -0,0 +1,81 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Callable, TYPE_CHECKING
+
+from contest import Contest
+
+if TYPE_CHECKING:
+    from contestrepository import ContestRepository
+
+
+# group commit for answers: at the start and end of a round, most teams answer or submit within the same
+# few seconds, and giving each of them its own load/modify/save would make them all wait on the store.
+# instead, operations on a contest are queued; a single worker per contest takes everything that's queued,
+# applies it in the order it arrived(so that team_submit_order follows the order of the submissions),
+# writes the contest once, and only then resolves every operation of the batch.
+# operations that arrive while a batch is being written make up the next batch.
+class AnswerQueue:
+    def __init__(self, repository: ContestRepository, max_batch_size: int = 500):
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.operations = 0
+        self._pending: dict[str, list[tuple[Callable[[Contest], Any], asyncio.Future]]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+
+    # queues operation(which is called with the contest) and waits until it has been applied and written.
+    # returns what operation returned, or raises what it raised; an operation that raises is simply skipped,
+    # so it should check everything it needs to before modifying the contest(as Team.answer does).
+    async def submit(self, contest_name: str, operation: Callable[[Contest], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(contest_name, []).append((operation, future))
+        if contest_name not in self._workers:
+            self._workers[contest_name] = loop.create_task(self._work(contest_name))
+        return await future
+
+    def pending_count(self, contest_name: str) -> int:
+        return len(self._pending.get(contest_name, ()))
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.operations / self.batches if self.batches else 0.0
+
+    async def _work(self, contest_name: str):
+        try:
+            while self._pending.get(contest_name):
+                queued = self._pending[contest_name]
+                batch, self._pending[contest_name] = queued[:self.max_batch_size], queued[self.max_batch_size:]
+                await self._apply_batch(contest_name, batch)
+        finally:
+            self._pending.pop(contest_name, None)
+            del self._workers[contest_name]
+
+    async def _apply_batch(self, contest_name: str, batch: list[tuple[Callable[[Contest], Any], asyncio.Future]]):
+        outcomes: list[tuple[asyncio.Future, Any, Exception | None]] = []
+        try:
+            # the same lock as ContestRepository.unit_of_work, so batches never interleave with other commands.
+            async with self.repository.lock(contest_name):
+                contest = await self.repository.get(contest_name)
+                for operation, future in batch:
+                    try:
+                        outcomes.append((future, operation(contest), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+                await self.repository.save_now(contest)
+        except Exception as error:
+            # the contest couldn't be loaded or written, so none of the operations can be acknowledged.
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result, error in outcomes:
+            # the command that queued the operation may have been cancelled in the meantime.
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import re
+from fractions import Fraction
+from typing import TYPE_CHECKING
+
+from exceptions import AnswerKeyFormatException, AnswerSheetFormatException
+
+if TYPE_CHECKING:
+    from contest import Contest
+    from question import Question
+
+# "1 : 3.5" and "1, 3.5" are read the same as "1:3.5".
+_SEPARATOR_PATTERN = re.compile(r"\s*([:,=])\s*")
+_ENTRY_PATTERN = re.compile(r"[\s;]+")
+
+
+def _parse_answer(text: str) -> float:
+    # Fraction reads integers, decimals, scientific notation and fractions like -1/3 exactly.
+    return float(Fraction(text))
+
+
+# reads an answer sheet, made of entries like "1:3.5 2:-7 5:1/3".
+# entries can be separated by spaces, newlines or semicolons, and "question,answer" lines(i.e. a csv file,
+# optionally with a header line) work as well.
+# every problem is collected before raising, so that they can all be fixed at once.
+def parse_answer_sheet(text: str) -> list[tuple[int, float]]:
+    entries = [entry for entry in _ENTRY_PATTERN.split(_SEPARATOR_PATTERN.sub(r"\1", text)) if entry]
+    answers: list[tuple[int, float]] = []
+    problems: list[str] = []
+    for entry_index, entry in enumerate(entries):
+        parts = re.split(r"[:,=]", entry)
+        if len(parts) != 2:
+            problems.append(f"'{entry}' should look like question:answer")
+            continue
+        question_text, answer_text = parts
+        try:
+            question_number = int(question_text)
+        except ValueError:
+            # the header line of a csv file.
+            if entry_index == 0 and not answer_text.lstrip("+-").replace(".", "", 1).isdigit():
+                continue
+            problems.append(f"'{question_text}' is not a question number")
+            continue
+        try:
+            answers.append((question_number, _parse_answer(answer_text)))
+        except (ValueError, ZeroDivisionError):
+            problems.append(f"'{answer_text}' (question {question_number}) is not a number")
+    if not answers and not problems:
+        problems.append("there are no answers in it")
+    if problems:
+        raise AnswerSheetFormatException(*problems)
+    return answers
+
+
+# checks every question number of the sheet against the contest in one pass,
+# and returns the questions along with their answers.
+def resolve_answer_sheet(contest: Contest, answers: list[tuple[int, float]]) -> list[tuple[Question, float]]:
+    problems: list[str] = []
+    seen_numbers: set[int] = set()
+    for question_number, _ in answers:
+        if not 1 <= question_number <= len(contest.questions):
+            problems.append(f"the contest doesn't have a question {question_number}")
+        elif question_number in seen_numbers:
+            problems.append(f"question {question_number} is answered more than once")
+        seen_numbers.add(question_number)
+    if problems:
+        raise AnswerSheetFormatException(*problems)
+    return [(contest.get_question(question_number), answer) for question_number, answer in answers]
+
+
+# reads an answer key, made of "answer,points" rows(one per question, in order), like "3.5,2 -7,1 1/3,4".
+# rows can be separated by newlines, spaces or semicolons, and a csv header row is skipped.
+def parse_answer_key(text: str) -> list[tuple[float, int]]:
+    rows = [row for row in _ENTRY_PATTERN.split(_SEPARATOR_PATTERN.sub(r"\1", text)) if row]
+    answer_key: list[tuple[float, int]] = []
+    problems: list[str] = []
+    for row_number, row in enumerate(rows, start=1):
+        parts = row.split(",")
+        if len(parts) != 2:
+            problems.append(f"'{row}' (row {row_number}) should look like answer,points")
+            continue
+        answer_text, points_text = parts
+        try:
+            answer = _parse_answer(answer_text)
+        except (ValueError, ZeroDivisionError):
+            # the header row of a csv file.
+            if row_number == 1 and not points_text.isdigit():
+                continue
+            problems.append(f"'{answer_text}' (row {row_number}) is not a number")
+            continue
+        if not points_text.isdigit():
+            problems.append(f"'{points_text}' (row {row_number}) is not a whole number of points")
+            continue
+        answer_key.append((answer, int(points_text)))
+    if not answer_key and not problems:
+        problems.append("there are no questions in it")
+    if problems:
+        raise AnswerKeyFormatException(*problems)
+    return answer_key
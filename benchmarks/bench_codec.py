@@ -0,0 +1,76 @@
+# compares the size and the encode/decode time of contest files written the old way(json.dump with
+# indent=6) against the compact formats of codec.py, on a synthetic contest.
+# run from the repository root with: python benchmarks/bench_codec.py
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import codec  # noqa: E402
+
+TEAM_COUNT = 10_000
+QUESTION_COUNT = 50
+
+
+def build_contest_data() -> dict:
+    rng = random.Random(0)
+    return {
+        "info": {
+            "teamSizeLimit": 4,
+            "link": "https://example.com/contest.pdf",
+            "name": "benchmark",
+            "period": "competition",
+            "teamSubmitOrder": TEAM_COUNT + 1
+        },
+        "questions": [
+            {"correctAnswer": rng.randint(-100, 100) / 4, "pointValue": rng.randint(1, 5)}
+            for _ in range(QUESTION_COUNT)
+        ],
+        "teams": [
+            {
+                "name": f"team {team_index}",
+                "ownerID": rng.getrandbits(60),
+                "memberIDs": [rng.getrandbits(60) for _ in range(3)],
+                "invitedMemberIDs": [rng.getrandbits(60)],
+                "answers": {
+                    question_number: rng.randint(-100, 100) / 4
+                    for question_number in range(1, QUESTION_COUNT + 1)
+                    if rng.random() < 0.9
+                },
+                "answersSubmitted": True,
+                "submitRanking": team_index + 1
+            }
+            for team_index in range(TEAM_COUNT)
+        ]
+    }
+
+
+def best_of(function, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(label: str, encode, decode):
+    raw = encode()
+    encode_time = best_of(encode)
+    decode_time = best_of(lambda: decode(raw))
+    print(f"{label:<24} {len(raw) / 1e6:>8.2f} MB {encode_time * 1000:>10.1f} ms {decode_time * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    data = build_contest_data()
+    print(f"{TEAM_COUNT} teams x {QUESTION_COUNT} questions")
+    print(f"{'format':<24} {'size':>11} {'encode':>13} {'decode':>13}")
+    report("json, indent=6 (old)", lambda: json.dumps(data, indent=6).encode(), json.loads)
+    report("json, compact", lambda: json.dumps(data, separators=(',', ':')).encode(), json.loads)
+    if codec.orjson is not None:
+        report("orjson, compact", lambda: codec.encode(data), codec.decode)
+    else:
+        print("orjson isn't installed, so it was skipped.")
@@ -0,0 +1,71 @@
+# compares the vectorized grading in grading.py against grading every answer one at a time
+# with Question.verify, on a synthetic contest.
+# run from the repository root with: python benchmarks/bench_grading.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from contest import Contest  # noqa: E402
+from contestperiod import ContestPeriod  # noqa: E402
+from grading import grade_contest  # noqa: E402
+from question import Question  # noqa: E402
+from team import Team  # noqa: E402
+
+TEAM_COUNT = 10_000
+QUESTION_COUNT = 50
+
+
+def build_contest() -> Contest:
+    rng = random.Random(0)
+    contest = Contest("benchmark", "")
+    for _ in range(QUESTION_COUNT):
+        contest.add_question(Question(contest, rng.randint(-100, 100) / 4, rng.randint(1, 5)))
+    contest.period = ContestPeriod.signup
+    for team_index in range(TEAM_COUNT):
+        contest.add_team(Team(contest, f"team {team_index}", team_index))
+    contest.period = ContestPeriod.competition
+    for team in contest.teams:
+        for question in contest.questions:
+            # roughly half of the answers are correct, and some questions are left unanswered.
+            roll = rng.random()
+            if roll < 0.5:
+                team.answer(question, question.correct_answer)
+            elif roll < 0.9:
+                team.answer(question, question.correct_answer + 1)
+        team.submit_answers()
+    return contest
+
+
+def python_totals(contest: Contest) -> list[float]:
+    totals = []
+    for team in contest.teams:
+        total = 0
+        for question_id, answer in team.answers.items():
+            question = contest.get_question_by_id(question_id)
+            if question is not None and question.verify(answer):
+                total += question.point_value
+        totals.append(total)
+    return totals
+
+
+def best_of(function, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    contest = build_contest()
+    assert python_totals(contest) == grade_contest(contest).total_points.tolist()
+    python_time = best_of(lambda: python_totals(contest))
+    numpy_time = best_of(lambda: grade_contest(contest))
+    print(f"{TEAM_COUNT} teams x {QUESTION_COUNT} questions")
+    print(f"pure python loop: {python_time * 1000:.1f} ms")
+    print(f"vectorized:       {numpy_time * 1000:.1f} ms")
+    print(f"speedup:          {python_time / numpy_time:.1f}x")
@@ -0,0 +1,64 @@
+# measures how much memory 10k teams take, comparing the slotted, array backed Team
+# against the previous layout(a plain class with lists of member ids and a dict of answers).
+# run from the repository root with: python benchmarks/bench_memory.py
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from contest import Contest  # noqa: E402
+from team import Team  # noqa: E402
+
+TEAM_COUNT = 10_000
+QUESTION_COUNT = 50
+
+
+# the attributes Team used to have, before it used __slots__ and arrays.
+class DictTeam:
+    def __init__(self, contest_instance: Contest, name: str, owner_id: int):
+        self.contest_instance = contest_instance
+        self.name = name
+        self.owner_id = owner_id
+        self.channel_id = None
+        self.submit_ranking = 0
+        self.answers_submitted = False
+        self.member_ids: list[int] = []
+        self.invited_member_ids: list[int] = []
+        self.answers: dict[int, float] = {}
+
+
+def build_teams(team_class, contest: Contest) -> list:
+    rng = random.Random(0)
+    teams = []
+    for team_index in range(TEAM_COUNT):
+        team = team_class(contest, f"team {team_index}", rng.getrandbits(60))
+        team.member_ids.extend(rng.getrandbits(60) for _ in range(3))
+        team.invited_member_ids.append(rng.getrandbits(60))
+        for question_number in range(1, QUESTION_COUNT + 1):
+            if rng.random() < 0.9:
+                team.answers[question_number] = rng.randint(-100, 100) / 4
+        teams.append(team)
+    return teams
+
+
+def measure(team_class, contest: Contest) -> int:
+    gc.collect()
+    tracemalloc.start()
+    teams = build_teams(team_class, contest)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del teams
+    return size
+
+
+if __name__ == "__main__":
+    contest = Contest("benchmark", "")
+    dict_size = measure(DictTeam, contest)
+    slotted_size = measure(Team, contest)
+    print(f"{TEAM_COUNT} teams x {QUESTION_COUNT} questions(3 members, 1 invite, 90% of questions answered)")
+    print(f"dicts and lists:    {dict_size / 1e6:.2f} MB")
+    print(f"slots and arrays:   {slotted_size / 1e6:.2f} MB")
+    print(f"reduction:          {1 - slotted_size / dict_size:.0%}")
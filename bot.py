@@ -1,24 +1,41 @@
-import json
 import discord
+import io
 import traceback
 import logging
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from datetime import datetime
 from pytz import timezone
 
+from answerqueue import AnswerQueue
+from answersheet import parse_answer_key, parse_answer_sheet, resolve_answer_sheet
+from bulkexecutor import BulkExecutor
 from contest import Contest
+from contestrepository import ContestRepository
+from conteststore import JsonContestStore, SqliteContestStore
+from journal import JournaledContestStore
+from looplag import LoopLagMonitor
+from membernames import MemberNameResolver
+from outbox import NotificationOutbox
 from team import Team
+from teamchannels import ChannelReport, assign_contestant_roles, close_team_channels, open_team_channels
+from teamimport import parse_team_roster
 from question import Question
+from scheduler import ContestScheduler, ScheduledContest
 from contestperiod import ContestPeriod
 from exceptions import (
+    AnswerKeyFormatException,
+    AnswerSheetFormatException,
     AnswersAlreadySubmittedException,
+    InputProblemsException,
     MemberInAnotherTeamException,
     MemberNotInTeamException,
     MemberNotInvitedException,
     OwnerLeaveTeamException,
     WrongPeriodException,
     TeamSizeExceededException,
+    TeamImportException,
     TeamNameException,
 )
 
@@ -33,51 +50,188 @@ tree: discord.app_commands.CommandTree = discord.app_commands.CommandTree(client
 GUILD = discord.Object(id=624314920158232616)
 DANIEL_USER_ID = 614549755342880778
 assert GUILD is not None
+# the amount of teams shown on each page of /team_rankings.
+RANKINGS_PAGE_SIZE = 20
+# discord doesn't allow autocompletion to return more choices than this.
+AUTOCOMPLETE_CHOICE_LIMIT = 25
+# the times given to /schedule_contest, in eastern time.
+SCHEDULE_TIME_FORMAT = "%Y-%m-%d %H:%M"
+# files attached to commands(answer sheets, team rosters, etc.) can't be larger than this, in bytes.
+ATTACHMENT_SIZE_LIMIT = 256 * 1024
+# only the first few problems of an input are listed, so that the message stays within discord's length limit.
+LISTED_PROBLEM_LIMIT = 20
+# commands that are expected to take longer than this(in seconds) are deferred right away,
+# since discord drops interactions that aren't responded to within 3 seconds.
+SLOW_OPERATION_THRESHOLD = 0.5
+
+# contests are stored as json files by default; see conteststore.py, journal.py and migrate_to_sqlite.py.
+pretty_contest_files = os.environ.get('pretty_contest_files') == 'true'
+match os.environ.get('contest_store', 'json'):
+    case 'sqlite':
+        Contest.store = SqliteContestStore(os.environ.get('contest_database', 'data/contests.db'))
+    case 'journal':
+        Contest.store = JournaledContestStore(pretty=pretty_contest_files)
+    case _:
+        Contest.store = JsonContestStore(pretty=pretty_contest_files)
+# contests are written at most once every few seconds; see ContestRepository.
+contests = ContestRepository(flush_interval=float(os.environ.get('contest_flush_interval', 5)))
+loop_lag = LoopLagMonitor()
+# answers and submissions are applied and written in batches; see answerqueue.py.
+answer_queue = AnswerQueue(contests)
+# used to create and delete team channels, and to assign roles, many at a time; see bulkexecutor.py.
+bulk_executor = BulkExecutor()
+# the display names shown by /show_teams and /all_contest_competitors; see membernames.py.
+member_names = MemberNameResolver()
+# DMs are sent in the background, so that commands don't wait on them; see outbox.py.
+outbox = NotificationOutbox(client)
+# starts and ends contests at scheduled times, creating their team channels ahead of time; see scheduler.py.
+scheduler = ContestScheduler(client, contests, bulk_executor)
+
+
+# responds to the interaction, or sends a followup message if it was already responded to(or deferred).
+async def respond(interaction, content: str | None = None, **kwargs):
+    if interaction.response.is_done():
+        await interaction.followup.send(content, **kwargs)
+    else:
+        await interaction.response.send_message(content, **kwargs)
+
+
+# defers the interaction if getting the contest will probably be slow: either because it has to be loaded
+# from the store, or because another command is modifying it.
+# note that once an interaction is deferred, its response can't be made ephemeral anymore.
+async def defer_if_slow(interaction, contest_name: str):
+    if interaction.response.is_done():
+        return
+    if contests.lock(contest_name).locked() or contests.predicted_load_time(contest_name) > SLOW_OPERATION_THRESHOLD:
+        await interaction.response.defer(thinking=True)
+
+
+# returns the text of an attached file, or None(after telling the user why) if it's too large or not text.
+async def read_text_attachment(interaction, file: discord.Attachment) -> str | None:
+    if file.size > ATTACHMENT_SIZE_LIMIT:
+        await respond(interaction, f"The file can be at most {ATTACHMENT_SIZE_LIMIT // 1024} KB large.", ephemeral=True)
+        return None
+    try:
+        return (await file.read()).decode('utf-8-sig')
+    except UnicodeDecodeError:
+        await respond(interaction, "The file has to be a text or csv file.", ephemeral=True)
+        return None
+
+
+# tells the user that nothing was done(message), along with the problems of the input they gave.
+async def respond_with_problems(interaction, message: str, error: InputProblemsException):
+    await respond(interaction, message + "\n" + "\n".join(error.problems[:LISTED_PROBLEM_LIMIT]), ephemeral=True)
+
+
+# returns a function that edits the (deferred) response of the interaction to show the progress of a bulk operation.
+def report_progress(interaction, description: str):
+    async def progress(finished: int, total: int):
+        try:
+            await interaction.edit_original_response(content=f"{description}: {finished}/{total}")
+        except discord.HTTPException:
+            # progress is only informative, so a failed edit shouldn't stop the operation.
+            pass
+    return progress
+
+
+# a summary of a bulk channel operation, listing what failed(and which members couldn't be found) all at once.
+def describe_channel_report(report: ChannelReport, success_message: str) -> str:
+    lines = [success_message]
+    if report.already_done or report.reused_channels:
+        lines.append(f"{report.already_done} team(s) were already done, and {report.reused_channels} existing "
+                     f"channel(s) were reused.")
+    if report.missing_member_ids:
+        lines.append(
+            "These members were not found: " + ", ".join(f"<@{member_id}>" for member_id in report.missing_member_ids))
+    if report.result.failures:
+        lines.append(f"{len(report.result.failures)} action(s) failed; run the command again to retry them:")
+        # only the first few failures are listed, so that the message stays within discord's length limit.
+        lines += [f"- {action.label}: {error}" for action, error in report.result.failures[:10]]
+    return "\n".join(lines)
+
+
+# reads a time given in SCHEDULE_TIME_FORMAT(in eastern time) as a unix timestamp, or returns None if it's invalid.
+def parse_schedule_time(text: str) -> float | None:
+    try:
+        return timezone('US/Eastern').localize(datetime.strptime(text.strip(), SCHEDULE_TIME_FORMAT)).timestamp()
+    except ValueError:
+        return None
+
+
+def format_schedule_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone('US/Eastern')).strftime(SCHEDULE_TIME_FORMAT)
+
+
+async def get_contest(interaction, contest_name: str) -> Contest:
+    await defer_if_slow(interaction, contest_name)
+    return await contests.get(contest_name)
+
+
+@asynccontextmanager
+async def contest_unit_of_work(interaction, contest_name: str):
+    await defer_if_slow(interaction, contest_name)
+    async with contests.unit_of_work(contest_name) as contest:
+        yield contest
 
 
 async def contest_name_autocompletion(interaction, current: str) -> list:
-    with open('data/generalContestInfo.json', 'r') as file:
-        contest_names = json.load(file)['allContestNames']
     data = []
-    for contest_name in contest_names:
+    for contest_name in contests.search_names(current, AUTOCOMPLETE_CHOICE_LIMIT):
         data.append(discord.app_commands.Choice(name=contest_name.lower(), value=contest_name))
     return data
 
 
 async def user_team_name_autocompletion(interaction, current: str):
     contest_name = interaction.namespace.contest_name
-    contest = Contest.from_json(contest_name)
+    contest = await contests.get(contest_name)
     team_name_choices = []
-    for team in contest.teams:
-        if interaction.user.id in team.invited_member_ids or interaction.user.id == team.owner_id:
-            team_name_choices.append(discord.app_commands.Choice(name=team.name.lower(), value=team.name))
+    for team_name in contest.search_team_names_of_user(interaction.user.id, current, AUTOCOMPLETE_CHOICE_LIMIT):
+        team_name_choices.append(discord.app_commands.Choice(name=team_name.lower(), value=team_name))
     return team_name_choices
 
 
 async def all_team_names_autocompletion(interaction, current: str):
-    contest = Contest.from_json(interaction.namespace.contest_name)
+    contest = await contests.get(interaction.namespace.contest_name)
     team_name_choices: list[discord.app_commands.Choice] = []
-    for team in contest.teams:
-        team_name_choices.append(discord.app_commands.Choice(name=team.name.lower(), value=team.name))
+    for team_name in contest.search_team_names(current, AUTOCOMPLETE_CHOICE_LIMIT):
+        team_name_choices.append(discord.app_commands.Choice(name=team_name.lower(), value=team_name))
     return team_name_choices
 
 
-def member_id_to_name(interaction, member_id: int) -> str:
-    member: discord.Member = interaction.guild.get_member(member_id)
-    if member is None:
-        return "(Member not found)"
-    else:
-        return member.display_name
+# maps every member id to its display name, requesting the members discord.py doesn't know of all at once.
+async def resolve_member_names(interaction, member_ids) -> dict[int, str]:
+    if not interaction.response.is_done() and member_names.needs_fetch(interaction.guild, member_ids):
+        await interaction.response.defer(thinking=True)
+    return await member_names.resolve(interaction.guild, member_ids)
 
 
 @client.event
 async def on_ready():
+    loop_lag.start()
+    scheduler.start()
+    outbox.start()
     print("Ready! - " + datetime.now(timezone('US/Eastern')).strftime("%m/%d/%Y %H:%M:%S"))
 
 
+@client.event
+async def on_member_join(member: discord.Member):
+    member_names.remember(member)
+
+
+@client.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    member_names.remember(after)
+
+
+@client.event
+async def on_member_remove(member: discord.Member):
+    member_names.forget(member.guild.id, member.id)
+
+
 @tree.error
 async def on_app_command_error(interaction, error):
-    await interaction.response.send_message(
+    await respond(
+        interaction,
         "Sorry, there was a problem with the bot, so an uncaught error has occurred. "
         "Please consult @DanielRocksUrMom for help.")
     daniel = client.get_user(DANIEL_USER_ID)
@@ -100,7 +254,8 @@ async def on_app_command_error(interaction, error):
               description="The starting point for the bot.",
               guild=GUILD)
 async def help_command(interaction):
-    await interaction.response.send_message(
+    await respond(
+        interaction,
         """
     The DSMC contest bot is a bot that manages DSMC competitions.
     See the bot page for descriptions on each of it's commands. 
@@ -109,6 +264,7 @@ async def help_command(interaction):
     /register_team 
     /join_team - needs an invitation 
     /answer_question 
+    /answer_sheet - Answers several questions at once 
     /submit_all_answers - Cannot be undone! 
     /leave_current_team - Owners must /transfer_ownership first 
     /show_answers - Shows your team's answers(not the correct ones) 
@@ -122,6 +278,7 @@ async def help_command(interaction):
     /show_teams 
     /contest_period 
     /team_rankings 
+    /my_rank 
     /link - Gets PDF/overleaf link 
         """
     )
@@ -132,13 +289,11 @@ async def help_command(interaction):
               guild=GUILD)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def create_contest(interaction, name: str, pdf_link: str, team_size_limit: int | None = None):
-    with open("data/generalContestInfo.json", "r") as file:
-        data_dict = json.load(file)
-        if name in data_dict['allContestNames']:
-            await interaction.response.send_message("A contest with name " + name + " already exists.", ephemeral=True)
-            return
-    Contest(name.lower(), pdf_link, team_size_limit).update_json()
-    await interaction.response.send_message("Contest successfully created!")
+    if contests.exists(name.lower()):
+        await respond(interaction, "A contest with name " + name + " already exists.", ephemeral=True)
+        return
+    await contests.add(Contest(name.lower(), pdf_link, team_size_limit))
+    await respond(interaction, "Contest successfully created!")
 
 
 @tree.command(name="all_contest_competitors",
@@ -146,10 +301,11 @@ async def create_contest(interaction, name: str, pdf_link: str, team_size_limit:
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def all_contest_competitors(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
-    all_participants = [member_id_to_name(interaction, member_id) for member_id in contest.registered_member_ids]
-    all_invited_participants = [member_id_to_name(interaction, member_id) for member_id in contest.invited_member_ids]
-    await interaction.response.send_message("These people are currently in a team: \n" + str(
+    contest = await get_contest(interaction, contest_name)
+    names = await resolve_member_names(interaction, [*contest.registered_member_ids, *contest.invited_member_ids])
+    all_participants = [names[member_id] for member_id in contest.registered_member_ids]
+    all_invited_participants = [names[member_id] for member_id in contest.invited_member_ids]
+    await respond(interaction, "These people are currently in a team: \n" + str(
         all_participants) + "\n These people are currently invited to a team: " + str(all_invited_participants))
 
 
@@ -159,42 +315,46 @@ async def all_contest_competitors(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def register_team(interaction, contest_name: str, team_name: str, member_two: discord.Member | None = None,
                         member_three: discord.Member | None = None, member_four: discord.Member | None = None):
-    contest = Contest.from_json(contest_name)
-    potential_current_team: Team | None = contest.get_team_of_user(interaction.user.id)
-    if potential_current_team:
-        await interaction.response.send_message(f"You seem to already be in team {potential_current_team.name}.")
-        return
-    invite_list: list[discord.Member] = []
-    if member_two:
-        invite_list.append(member_two)
-    if member_three:
-        invite_list.append(member_three)
-    if member_four:
-        invite_list.append(member_four)
-    try:
-        new_team = Team(
-            contest_instance=contest,
-            name=team_name,
-            owner_id=interaction.user.id
-        )
-        contest.add_team(new_team)
-        await interaction.response.send_message(
-            f"Team '{team_name}' has been added to the contest with {[member.display_name for member in invite_list]}"
-            f" invited. In order for users to join your team, they must use /join_team.")
-        for member in invite_list:
-            new_team.invite_member(member.id)
-            channel = await member.create_dm()
-            await channel.send(
-                f"The user {interaction.user} has invited you to join the team '{team_name}'"
-                f"for the contest '{contest_name}'. In order to join, "
-                f"use /join_team in the Mathematics Server (not in the DMs)."
-                f"If you don't want to join, or if you're already in another team, ignore this message.")
-        contest.update_json()
-    except WrongPeriodException:
-        await interaction.response.send_message(
-            "You can only create a team when this contest is in it's signup phase. Sorry!")
-    except TeamNameException:
-        await interaction.response.send_message("There is already a team with the name " + team_name)
+    # the invitations are only sent once the team has been added.
+    invited_member_ids: list[int] = []
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        potential_current_team: Team | None = contest.get_team_of_user(interaction.user.id)
+        if potential_current_team:
+            await respond(interaction, f"You seem to already be in team {potential_current_team.name}.")
+            return
+        invite_list: list[discord.Member] = []
+        if member_two:
+            invite_list.append(member_two)
+        if member_three:
+            invite_list.append(member_three)
+        if member_four:
+            invite_list.append(member_four)
+        try:
+            new_team = Team(
+                contest_instance=contest,
+                name=team_name,
+                owner_id=interaction.user.id
+            )
+            contest.add_team(new_team)
+            await respond(
+                interaction,
+                f"Team '{team_name}' has been added to the contest with "
+                f"{[member.display_name for member in invite_list]} invited. "
+                f"In order for users to join your team, they must use /join_team.")
+            for member in invite_list:
+                new_team.invite_member(member.id)
+                invited_member_ids.append(member.id)
+        except WrongPeriodException:
+            await respond(
+                interaction, "You can only create a team when this contest is in it's signup phase. Sorry!")
+        except TeamNameException:
+            await respond(interaction, "There is already a team with the name " + team_name)
+    await outbox.enqueue(
+        invited_member_ids,
+        f"The user {interaction.user} has invited you to join the team '{team_name}'"
+        f"for the contest '{contest_name}'. In order to join, "
+        f"use /join_team in the Mathematics Server (not in the DMs)."
+        f"If you don't want to join, or if you're already in another team, ignore this message.")
 
 
 @tree.command(name="create_team",
@@ -204,32 +364,63 @@ async def register_team(interaction, contest_name: str, team_name: str, member_t
 async def create_team(interaction, contest_name: str, team_name: str,
                       owner: discord.Member, member_two: discord.Member | None = None,
                       member_three: discord.Member | None = None, member_four: discord.Member | None = None):
-    contest = Contest.from_json(contest_name)
-    potential_current_team: Team | None = contest.get_team_of_user(owner.id)
-    if potential_current_team:
-        await interaction.response.send_message(f"The owner is already in team {potential_current_team.name}.")
-        return
-    if team_name in map(lambda t: t.name, contest.teams):
-        await interaction.response.send_message(f"The team with name {team_name} already exists.")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        potential_current_team: Team | None = contest.get_team_of_user(owner.id)
+        if potential_current_team:
+            await respond(interaction, f"The owner is already in team {potential_current_team.name}.")
+            return
+        if contest.team_name_taken(team_name):
+            await respond(interaction, f"The team with name {team_name} already exists.")
+            return
+        try:
+            new_team = Team(
+                contest_instance=contest,
+                name=team_name,
+                owner_id=owner.id
+            )
+            contest.add_team(new_team)
+            for member in [member_two, member_three, member_four]:
+                if member is None:
+                    continue
+                new_team.register_member(member.id, ignore_invite=True)
+            await respond(interaction, f"Team {team_name} has been created by admin.", ephemeral=True)
+        except WrongPeriodException:
+            await respond(
+                interaction, "You can only create a team when this contest is in it's signup phase. Sorry!")
+        except TeamNameException:
+            await respond(interaction, "There is already a team with the name " + team_name)
+
+
+@tree.command(name="import_teams",
+              description="[Mod Only] Registers teams from a csv file of 'team name, owner id, member ids...' rows.",
+              guild=GUILD)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+async def import_teams(interaction, contest_name: str, file: discord.Attachment):
+    roster = await read_text_attachment(interaction, file)
+    if roster is None:
         return
-    try:
-        new_team = Team(
-            contest_instance=contest,
-            name=team_name,
-            owner_id=owner.id
-        )
-        contest.add_team(new_team)
-        for member in [member_two, member_three, member_four]:
-            if member is None:
-                continue
-            new_team.register_member(member.id, ignore_invite=True)
-        await interaction.response.send_message(f"Team {team_name} has been created by admin.", ephemeral=True)
-        contest.update_json()
-    except WrongPeriodException:
-        await interaction.response.send_message(
-            "You can only create a team when this contest is in it's signup phase. Sorry!")
-    except TeamNameException:
-        await interaction.response.send_message("There is already a team with the name " + team_name)
+    # the problems are answered inside the unit of work, since add_teams checks the whole roster before adding
+    # anything; letting them escape it would roll the contest back for nothing.
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            new_teams: list[Team] = []
+            for team_name, owner_id, member_ids in parse_team_roster(roster):
+                new_team = Team(contest_instance=contest, name=team_name, owner_id=owner_id)
+                new_team.member_ids.extend(member_ids)
+                new_teams.append(new_team)
+            contest.add_teams(new_teams)
+        except TeamImportException as error:
+            await respond_with_problems(interaction, "No team was imported, since the roster has some problems:", error)
+            return
+        except WrongPeriodException:
+            await respond(
+                interaction, "You can only import teams when this contest is in it's signup phase.", ephemeral=True)
+            return
+    await respond(
+        interaction,
+        f"{len(new_teams)} team(s) with {sum(len(team.member_ids) + 1 for team in new_teams)} member(s) "
+        f"have been imported.")
 
 
 @tree.command(name="invite_members",
@@ -238,23 +429,22 @@ async def create_team(interaction, contest_name: str, team_name: str,
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def invite_more_members(interaction, contest_name: str, member_one: discord.Member,
                               member_two: discord.Member | None = None, member_three: discord.Member | None = None):
-    contest = Contest.from_json(contest_name)
-    success_messages: list[str] = []
-    user_team = contest.get_team_of_user(interaction.user.id)
-    if user_team is None:
-        await interaction.response.send_message("Hmmm... It looks like you are not in a team yet.")
-        return
-    if member_one:
-        user_team.invite_member(member_one.id)
-        success_messages.append(f"{member_one.display_name} has been successfully invited.")
-    if member_two:
-        user_team.invite_member(member_two.id)
-        success_messages.append(f"{member_two.display_name} has been successfully invited.")
-    if member_three:
-        user_team.invite_member(member_three.id)
-        success_messages.append(f"{member_three.display_name} has been successfully invited.")
-    contest.update_json()
-    await interaction.response.send_message("\n".join(success_messages))
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        success_messages: list[str] = []
+        user_team = contest.get_team_of_user(interaction.user.id)
+        if user_team is None:
+            await respond(interaction, "Hmmm... It looks like you are not in a team yet.")
+            return
+        if member_one:
+            user_team.invite_member(member_one.id)
+            success_messages.append(f"{member_one.display_name} has been successfully invited.")
+        if member_two:
+            user_team.invite_member(member_two.id)
+            success_messages.append(f"{member_two.display_name} has been successfully invited.")
+        if member_three:
+            user_team.invite_member(member_three.id)
+            success_messages.append(f"{member_three.display_name} has been successfully invited.")
+        await respond(interaction, "\n".join(success_messages))
 
 
 @tree.command(name="join_team",
@@ -262,29 +452,32 @@ async def invite_more_members(interaction, contest_name: str, member_one: discor
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=user_team_name_autocompletion)
 async def join_team(interaction, contest_name: str, team_name: str):
-    contest = Contest.from_json(contest_name)
-    new_team = contest.get_team(team_name)
-    if interaction.user.id in new_team.member_ids + [new_team.owner_id]:
-        await interaction.response.send_message(
-            "Looks like you are already in this team. To leave, use /leave_current_team.",
-            ephemeral=True)
-        return
-    try:
-        new_team.register_member(interaction.user.id)
-        await interaction.response.send_message(
-            f"Hooray! You have officially joined team {team_name}! to leave, use /leave_current_team.")
-        contest.update_json()
-    except MemberNotInvitedException:
-        await interaction.response.send_message(
-            "Hmmm.... It seems that you haven't been invited to this team.",
-            ephemeral=True)
-    except MemberInAnotherTeamException:
-        await interaction.response.send_message(
-            "You've already joined another team! Use /leave_current_team to leave your current team, "
-            "then use /join_team to join this one.",
-            ephemeral=True)
-    except TeamSizeExceededException:
-        await interaction.response.send_message(f"The team size limit of {contest.team_size_limit} has been exceeded.")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        new_team = contest.get_team(team_name)
+        if new_team.member_in_team(interaction.user.id):
+            await respond(
+                interaction,
+                "Looks like you are already in this team. To leave, use /leave_current_team.",
+                ephemeral=True)
+            return
+        try:
+            new_team.register_member(interaction.user.id)
+            await respond(
+                interaction, f"Hooray! You have officially joined team {team_name}! to leave, use /leave_current_team.")
+        except MemberNotInvitedException:
+            await respond(
+                interaction,
+                "Hmmm.... It seems that you haven't been invited to this team.",
+                ephemeral=True)
+        except MemberInAnotherTeamException:
+            await respond(
+                interaction,
+                "You've already joined another team! Use /leave_current_team to leave your current team, "
+                "then use /join_team to join this one.",
+                ephemeral=True)
+        except TeamSizeExceededException:
+            await respond(
+                interaction, f"The team size limit of {contest.team_size_limit} has been exceeded.")
 
 
 @tree.command(name="change_team_name",
@@ -292,18 +485,23 @@ async def join_team(interaction, contest_name: str, team_name: str):
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def change_team_name(interaction, contest_name: str, new_team_name: str):
-    contest = Contest.from_json(contest_name)
-    team: Team | None = contest.get_team_of_user(interaction.user.id)
-    if team:
-        previous_name = team.name
-        team.name = new_team_name
-        contest.update_json()
-        await interaction.response.send_message(
-            "The team that was previously referred to as '" +
-            previous_name + "' now has the name '" + team.name + "'."
-        )
-    else:
-        await interaction.response.send_message("It seems that you are not in a team currently.", ephemeral=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        team: Team | None = contest.get_team_of_user(interaction.user.id)
+        if team:
+            previous_name = team.name
+            try:
+                contest.rename_team(team, new_team_name)
+            except TeamNameException:
+                await respond(
+                    interaction, "There is already a team with the name " + new_team_name, ephemeral=True)
+                return
+            await respond(
+                interaction,
+                "The team that was previously referred to as '" +
+                previous_name + "' now has the name '" + team.name + "'."
+            )
+        else:
+            await respond(interaction, "It seems that you are not in a team currently.", ephemeral=True)
 
 
 @tree.command(name="change_team_size_limit",
@@ -312,10 +510,9 @@ async def change_team_name(interaction, contest_name: str, new_team_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def modify_team_size_limit(interaction, contest_name: str, size_limit: int):
-    contest = Contest.from_json(contest_name)
-    contest.team_size_limit = size_limit
-    contest.update_json()
-    await interaction.response.send_message("Team size limit has been updated to " + str(size_limit) + ".")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        contest.team_size_limit = size_limit
+        await respond(interaction, "Team size limit has been updated to " + str(size_limit) + ".")
 
 
 @tree.command(name="leave_current_team",
@@ -323,19 +520,19 @@ async def modify_team_size_limit(interaction, contest_name: str, size_limit: int
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def leave_current_team(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
-    user_team = contest.get_team_of_user(interaction.user.id)
-    if user_team is None:
-        await interaction.response.send_message("Hmmm... You don't seem to be in a team as of now.", ephemeral=True)
-    else:
-        try:
-            user_team.remove_member(interaction.user.id)
-            contest.update_json()
-            await interaction.response.send_message("You have officially left your current team.")
-        except OwnerLeaveTeamException:
-            await interaction.response.send_message(
-                "As the owner of this team, you cannot leave. You must either delete the team or transfer ownership "
-                "to another person(via the /transfer_ownership command)")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        user_team = contest.get_team_of_user(interaction.user.id)
+        if user_team is None:
+            await respond(interaction, "Hmmm... You don't seem to be in a team as of now.", ephemeral=True)
+        else:
+            try:
+                user_team.remove_member(interaction.user.id)
+                await respond(interaction, "You have officially left your current team.")
+            except OwnerLeaveTeamException:
+                await respond(
+                    interaction,
+                    "As the owner of this team, you cannot leave. You must either delete the team or transfer "
+                    "ownership to another person(via the /transfer_ownership command)")
 
 
 @tree.command(name="transfer_ownership",
@@ -343,21 +540,24 @@ async def leave_current_team(interaction, contest_name: str):
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def transfer_ownership(interaction, contest_name: str, new_owner: discord.Member):
-    try:
-        contest = Contest.from_json(contest_name)
-        player_team = contest.get_team_of_user(interaction.user.id)
-        if player_team is None:
-            await interaction.response.send_message("it looks like you are not in a team currently.")
-        elif interaction.user.id == player_team.owner_id:
-            player_team.transfer_ownership(new_owner.id)
-            contest.update_json()
-            await interaction.response.send_message(f"Ownership has been successfully transferred to {new_owner}!")
-        else:
-            await interaction.response.send_message(
-                "Sorry, you're not the owner of the team you're in, so you cannot transfer ownership.", ephemeral=True)
-    except MemberNotInTeamException:
-        await interaction.response.send_message(
-            "The member that you tried to transfer ownership in is not in the team(or hasn't accepted the invite yet).")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            player_team = contest.get_team_of_user(interaction.user.id)
+            if player_team is None:
+                await respond(interaction, "it looks like you are not in a team currently.")
+            elif interaction.user.id == player_team.owner_id:
+                player_team.transfer_ownership(new_owner.id)
+                await respond(interaction, f"Ownership has been successfully transferred to {new_owner}!")
+            else:
+                await respond(
+                    interaction,
+                    "Sorry, you're not the owner of the team you're in, so you cannot transfer ownership.",
+                    ephemeral=True)
+        except MemberNotInTeamException:
+            await respond(
+                interaction,
+                "The member that you tried to transfer ownership in is not in the team"
+                "(or hasn't accepted the invite yet).")
 
 
 @tree.command(name="unregister_team",
@@ -365,24 +565,26 @@ async def transfer_ownership(interaction, contest_name: str, new_owner: discord.
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def unregister_team(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
-    user_team = contest.get_team_of_user(interaction.user.id)
-    if user_team is None:
-        await interaction.response.send_message("Hmm.... You don't seem to be in a team as of now.", ephemeral=True)
-    elif user_team.owner_id != interaction.user.id:
-        await interaction.response.send_message(
-            "Holdup! You can't delete this team, as it was created by someone else. "
-            "Ask the creator to delete the team. If you want to leave, use /leave_current_team.",
-            ephemeral=True)
-    else:
-        contest.remove_team(user_team)
-        for member_id in user_team.member_ids:
-            channel = await interaction.guild.get_member(member_id).create_dm()
-            await channel.send(
-                f"The original owner of team {user_team.name} has deleted this team. "
-                f"To sign up for another team, ask another team owner to invite you, then use /join.")
-        await interaction.response.send_message("Success!")
-        contest.update_json()
+    removed_team: Team | None = None
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        user_team = contest.get_team_of_user(interaction.user.id)
+        if user_team is None:
+            await respond(interaction, "Hmm.... You don't seem to be in a team as of now.", ephemeral=True)
+        elif user_team.owner_id != interaction.user.id:
+            await respond(
+                interaction,
+                "Holdup! You can't delete this team, as it was created by someone else. "
+                "Ask the creator to delete the team. If you want to leave, use /leave_current_team.",
+                ephemeral=True)
+        else:
+            contest.remove_team(user_team)
+            removed_team = user_team
+            await respond(interaction, "Success!")
+    if removed_team is not None:
+        await outbox.enqueue(
+            removed_team.member_ids,
+            f"The original owner of team {removed_team.name} has deleted this team. "
+            f"To sign up for another team, ask another team owner to invite you, then use /join.")
 
 
 @tree.command(name="add_question",
@@ -391,19 +593,67 @@ async def unregister_team(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def add_question(interaction, contest_name: str, answer: float, points: int, problem_number: int | None = None):
-    contest = Contest.from_json(contest_name)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            if problem_number is None:
+                contest.add_question(Question(contest, answer, points))
+            else:
+                contest.add_question(Question(contest, answer, points), problem_number)
+            await respond(interaction, "Success!")
+        except WrongPeriodException:
+            await respond(
+                interaction,
+                "currently, the contest is underway. You cannot add questions at this time.", ephemeral=True)
+        except IndexError:
+            await respond(interaction, "Hmm.... your question index is out of bounds", ephemeral=True)
+
+
+@tree.command(name="import_questions",
+              description="[Mod Only] Adds questions from a list(or file) of 'answer,points' rows, one per question.",
+              guild=GUILD)
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def import_questions(interaction, contest_name: str, answer_key: str | None = None,
+                           file: discord.Attachment | None = None, dry_run: bool = False):
+    if (answer_key is None) == (file is None):
+        await respond(interaction, "Please give either a list of questions or a file, but not both.", ephemeral=True)
+        return
+    text = answer_key if file is None else await read_text_attachment(interaction, file)
+    if text is None:
+        return
     try:
-        if problem_number is None:
-            contest.add_question(Question(contest, answer, points))
+        parsed_key = parse_answer_key(text)
+        if dry_run:
+            contest = await get_contest(interaction, contest_name)
+            if contest.period != ContestPeriod.preSignup and contest.period != ContestPeriod.signup:
+                raise WrongPeriodException(ContestPeriod.preSignup, ContestPeriod.signup)
         else:
-            contest.add_question(Question(contest, answer, points), problem_number)
-        contest.update_json()
-        await interaction.response.send_message("Success!")
+            async with contest_unit_of_work(interaction, contest_name) as contest:
+                contest.add_questions([Question(contest, answer, points) for answer, points in parsed_key])
+    except AnswerKeyFormatException as error:
+        await respond_with_problems(
+            interaction, "No question was added, since the answer key has some problems:", error)
+        return
     except WrongPeriodException:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "currently, the contest is underway. You cannot add questions at this time.", ephemeral=True)
-    except IndexError:
-        await interaction.response.send_message("Hmm.... your question index is out of bounds", ephemeral=True)
+        return
+    first_number = len(contest.questions) + 1 if dry_run else len(contest.questions) - len(parsed_key) + 1
+    key_lines = [
+        f"Question {question_number}: answer = {answer}, points = {points}"
+        for question_number, (answer, points) in enumerate(parsed_key, start=first_number)
+    ]
+    summary = (f"{len(parsed_key)} question(s) would be added (nothing was changed):" if dry_run
+               else f"{len(parsed_key)} question(s) have been added:")
+    # long answer keys are sent as a file instead, since discord messages are limited to 2000 characters.
+    message = summary + "\n" + "\n".join(key_lines)
+    if len(message) <= 1900:
+        await respond(interaction, message, ephemeral=True)
+    else:
+        await respond(
+            interaction, summary, ephemeral=True,
+            file=discord.File(io.BytesIO("\n".join(key_lines).encode()), filename="answer_key.txt"))
 
 
 @tree.command(name="remove_question", description="[Mod Only] Removes a question from a specified contest.",
@@ -411,13 +661,14 @@ async def add_question(interaction, contest_name: str, answer: float, points: in
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def remove_question(interaction, contest_name: str, question_number: int):
-    contest = Contest.from_json(contest_name)
-    try:
-        contest.remove_question(question_number)
-        contest.update_json()
-        await interaction.response.send_message("Question with number " + str(question_number) + " has been removed.")
-    except WrongPeriodException:
-        await interaction.response.send_message("The competition is underway, so you cannot add or remove questions.")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            contest.remove_question(question_number)
+            await respond(
+                interaction, "Question with number " + str(question_number) + " has been removed.")
+        except WrongPeriodException:
+            await respond(
+                interaction, "The competition is underway, so you cannot add or remove questions.")
 
 
 @tree.command(name="change_question",
@@ -427,16 +678,36 @@ async def remove_question(interaction, contest_name: str, question_number: int):
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def change_answer(interaction, contest_name: str, question_num: int,
                         new_answer: float | None = None, new_point_value: float | None = None):
-    contest = Contest.from_json(contest_name)
-    try:
-        question = contest.get_question(question_num)
-        if new_answer:
-            question.correct_answer = new_answer
-        if new_point_value:
-            question.point_value = new_point_value
-        contest.update_json()
-    except KeyError:
-        await interaction.response.send_message(f"The contest only has a total of {len(contest.questions)} questions.")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            question = contest.get_question(question_num)
+            if new_answer:
+                question.correct_answer = new_answer
+            if new_point_value:
+                question.point_value = new_point_value
+        except KeyError:
+            await respond(
+                interaction, f"The contest only has a total of {len(contest.questions)} questions.")
+
+
+@tree.command(name="regrade_contest",
+              description="[Mod Only] Regrades every team's answers and updates their scores.",
+              guild=GUILD)
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def regrade_contest(interaction, contest_name: str):
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        previous_points = {team: team.total_points for team in contest.teams}
+        result = contest.scoreboard.regrade()
+        changed_teams = [team.name for team in contest.teams if team.total_points != previous_points[team]]
+    question_lines = [
+        f"Question {question_number}: {correct_count} team(s) correct"
+        for question_number, correct_count in enumerate(result.correct_count_per_question.tolist(), start=1)
+    ]
+    await respond(
+        interaction,
+        f"Regraded {len(result.teams)} teams. Teams whose score changed: {changed_teams} \n" +
+        "\n".join(question_lines))
 
 
 @tree.command(name="change_contest_period",
@@ -461,12 +732,12 @@ async def change_contest_period(interaction, contest_name: str, period_name: str
         case 'post-competition':
             period = ContestPeriod.postCompetition
         case _:
-            await interaction.response.send_message("An invalid period name has been entered.", ephemeral=True)
+            await respond(interaction, "An invalid period name has been entered.", ephemeral=True)
             return
-    contest = Contest.from_json(contest_name)
-    contest.period = period
-    contest.update_json()
-    await interaction.response.send_message(f"Success! The contest period has been changed to {period_name}.")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        contest.period = period
+    await contests.flush(contest_name)
+    await respond(interaction, f"Success! The contest period has been changed to {period_name}.")
 
 
 @tree.command(name="contest_period",
@@ -474,7 +745,7 @@ async def change_contest_period(interaction, contest_name: str, period_name: str
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def contest_period(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     match contest.period:
         case ContestPeriod.preSignup:
             message = "The current period of the contest is pre-signup. In this phase, you cannot register teams."
@@ -489,7 +760,7 @@ async def contest_period(interaction, contest_name: str):
                        "finished; and results are out. No answers can be submitted.")
         case _:
             message = "Unknown period...Ask Daniel to update the contest_period command."
-    await interaction.response.send_message(message)
+    await respond(interaction, message)
 
 
 @tree.command(name="start_competition",
@@ -498,34 +769,16 @@ async def contest_period(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def start_competition(interaction, contest_name: str, channel_category: discord.CategoryChannel):
-    contest = Contest.from_json(contest_name)
-    # sets the contest period
-    contest.period = ContestPeriod.competition
-    # then, creates the appropriate contest channels
-    manager_role = discord.utils.get(interaction.guild.roles, name="Olympiad Team")
-    admin_role = discord.utils.get(interaction.guild.roles, name="Olympiad Manager")
-    contestant_role = discord.utils.get(interaction.guild.roles, name="DSMC Contestant")
-    for team in contest.teams:
-        overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            manager_role: discord.PermissionOverwrite(read_messages=True),
-            admin_role: discord.PermissionOverwrite(read_messages=True),
-            interaction.guild.get_member(team.owner_id): discord.PermissionOverwrite(read_messages=True)
-        }
-        for member_id in team.member_ids:
-            member = interaction.guild.get_member(member_id)
-            if member:
-                overwrites[member] = discord.PermissionOverwrite(read_messages=True)
-                await member.add_roles(contestant_role)
-            else:
-                await interaction.response.send_message("Member with ID {member_id} was not found.", ephemeral=True)
-        channel = await interaction.guild.create_text_channel(
-            team.name + '-contest-channel',
-            overwrites=overwrites,
-            category=channel_category)
-        team.channel_id = channel.id
-    contest.update_json()
-    await interaction.response.send_message("Channels have been opened!.")
+    await interaction.response.defer(thinking=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        contest.period = ContestPeriod.competition
+    await contests.flush(contest_name)
+    # the channels are created outside of the contest's lock, so that teams can start answering right away.
+    # if this fails halfway, running the command again picks up where it left off; see teamchannels.py.
+    report = await open_team_channels(
+        contests, contest_name, interaction.guild, channel_category, bulk_executor,
+        report_progress(interaction, "Opening channels"))
+    await respond(interaction, describe_channel_report(report, "Channels have been opened!"))
 
 
 @tree.command(name="assign_roles",
@@ -533,13 +786,11 @@ async def start_competition(interaction, contest_name: str, channel_category: di
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
-async def start_competition(interaction, contest_name: str):
-    contestant_role = discord.utils.get(interaction.guild.roles, name="DSMC Contestant")
-    for member_id in Contest.from_json(contest_name).registered_member_ids:
-        member = interaction.guild.get_member(member_id)
-        if member:
-            await member.add_roles(contestant_role)
-    await interaction.response.send_message("Success!")
+async def assign_roles(interaction, contest_name: str):
+    await interaction.response.defer(thinking=True)
+    report = await assign_contestant_roles(
+        contests, contest_name, interaction.guild, bulk_executor, report_progress(interaction, "Assigning roles"))
+    await respond(interaction, describe_channel_report(report, "Success!"))
 
 
 # untested.
@@ -549,13 +800,69 @@ async def start_competition(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def end_competition(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
-    contest.period = ContestPeriod.postCompetition
-    contest.update_json()
-    for team in contest.teams:
-        if team.channel_id:
-            await interaction.guild.get_channel(team.channel_id).delete()
-    await interaction.response.send_message("All contest channels deleted!.")
+    await interaction.response.defer(thinking=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        contest.period = ContestPeriod.postCompetition
+    await contests.flush(contest_name)
+    report = await close_team_channels(
+        contests, contest_name, interaction.guild, bulk_executor, report_progress(interaction, "Deleting channels"))
+    await respond(interaction, describe_channel_report(report, "All contest channels deleted!"))
+
+
+@tree.command(name="schedule_contest",
+              description="[Mod Only] Starts(and optionally ends) the competition automatically at the given times.",
+              guild=GUILD)
+@discord.app_commands.describe(
+    start_time="In eastern time, like 2024-03-09 13:00",
+    end_time="In eastern time, like 2024-03-09 16:00")
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def schedule_contest(interaction, contest_name: str, channel_category: discord.CategoryChannel,
+                           start_time: str, end_time: str | None = None):
+    if not contests.exists(contest_name):
+        await respond(interaction, "This contest doesn't exist.", ephemeral=True)
+        return
+    start = parse_schedule_time(start_time)
+    end = parse_schedule_time(end_time) if end_time is not None else None
+    if start is None or (end_time is not None and end is None):
+        await respond(interaction, "Times have to look like 2024-03-09 13:00.", ephemeral=True)
+        return
+    if end is not None and end <= start:
+        await respond(interaction, "The contest has to end after it starts.", ephemeral=True)
+        return
+    await scheduler.schedule(
+        ScheduledContest(contest_name, start, end, interaction.guild.id, channel_category.id))
+    message = (f"Success! {contest_name} will start at {format_schedule_time(start)}; its team channels will be "
+               f"created {scheduler.staging_lead / 60:.0f} minutes before that.")
+    if end is not None:
+        message += f" It will end at {format_schedule_time(end)}."
+    await respond(interaction, message)
+
+
+@tree.command(name="unschedule_contest",
+              description="[Mod Only] Cancels the automatic start and end of a contest.",
+              guild=GUILD)
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def unschedule_contest(interaction, contest_name: str):
+    if await scheduler.unschedule(contest_name):
+        await respond(interaction, "Success! The contest is no longer scheduled.")
+    else:
+        await respond(interaction, "This contest isn't scheduled.", ephemeral=True)
+
+
+@tree.command(name="contest_schedule",
+              description="[Mod Only] Shows when each scheduled contest starts and ends.",
+              guild=GUILD)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def contest_schedule(interaction):
+    lines = []
+    for entry in scheduler.entries.values():
+        line = f"{entry.contest_name}: starts at {format_schedule_time(entry.start_time)}"
+        if entry.end_time is not None:
+            line += f", ends at {format_schedule_time(entry.end_time)}"
+        lines.append(line + f" ({entry.stage})")
+    await respond(interaction, "\n".join(lines) if lines else "No contest is scheduled.", ephemeral=True)
 
 
 @tree.command(name="answer_question",
@@ -563,30 +870,85 @@ async def end_competition(interaction, contest_name: str):
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def answer_question(interaction, contest_name: str, question_number: int, answer: float):
-    try:
-        contest = Contest.from_json(contest_name)
+    def answer_operation(contest: Contest) -> Team | None:
         user_team = contest.get_team_of_user(interaction.user.id)
         if user_team:
-            user_team.answer(contest.get_question(question_number), answer)
+            user_team.answer(contest.get_question(question_number), answer, interaction.user.id)
+        return user_team
+
+    await defer_if_slow(interaction, contest_name)
+    try:
+        if await answer_queue.submit(contest_name, answer_operation):
+            await respond(
+                interaction, str(interaction.user) + f" has answered question {question_number}!")
         else:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Hmmm..... your team doesn't seem to be found in the contest. Maybe you haven't signed up yet?",
                 ephemeral=True)
-        contest.update_json()
-        await interaction.response.send_message(
-            str(interaction.user) + f" has answered question {question_number}!")
     except AnswersAlreadySubmittedException:
-        await interaction.response.send_message(
-            "Sorry, you have already submitted your answers. Once you submit your answers, you cannot answer anything "
-            "else.",
+        await respond(
+            interaction,
+            "Sorry, you have already submitted your answers. Once you submit your answers, "
+            "you cannot answer anything else.",
             ephemeral=True)
     except WrongPeriodException:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "Sorry, you can't submit any answers right now, as the contest period is not the competition period.",
             ephemeral=True)
     except IndexError:
-        await interaction.response.send_message(
-            "Sorry, but the contest doesn't have a problem with number " + str(question_number))
+        await respond(
+            interaction, "Sorry, but the contest doesn't have a problem with number " + str(question_number))
+
+
+@tree.command(name="answer_sheet",
+              description="Answers several questions at once, like '1:3.5 2:-7 5:1/3', or from a text/csv file.",
+              guild=GUILD)
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+async def answer_sheet(interaction, contest_name: str, answers: str | None = None,
+                       file: discord.Attachment | None = None):
+    if (answers is None) == (file is None):
+        await respond(interaction, "Please give either a list of answers or a file, but not both.", ephemeral=True)
+        return
+    sheet = answers if file is None else await read_text_attachment(interaction, file)
+    if sheet is None:
+        return
+
+    def answer_sheet_operation(contest: Contest) -> Team | None:
+        user_team = contest.get_team_of_user(interaction.user.id)
+        if user_team:
+            user_team.answer_many(resolve_answer_sheet(contest, parsed_answers), interaction.user.id)
+        return user_team
+
+    try:
+        # the sheet is parsed before it's queued; only checking it against the questions needs the contest.
+        parsed_answers = parse_answer_sheet(sheet)
+        await defer_if_slow(interaction, contest_name)
+        if await answer_queue.submit(contest_name, answer_sheet_operation):
+            await respond(
+                interaction,
+                f"{interaction.user} has answered questions "
+                f"{', '.join(str(question_number) for question_number, _ in parsed_answers)}!")
+        else:
+            await respond(
+                interaction,
+                "Hmmm..... your team doesn't seem to be found in the contest. Maybe you haven't signed up yet?",
+                ephemeral=True)
+    except AnswerSheetFormatException as error:
+        await respond_with_problems(
+            interaction, "Nothing was answered, since the answer sheet has some problems:", error)
+    except AnswersAlreadySubmittedException:
+        await respond(
+            interaction,
+            "Sorry, you have already submitted your answers. Once you submit your answers, "
+            "you cannot answer anything else.",
+            ephemeral=True)
+    except WrongPeriodException:
+        await respond(
+            interaction,
+            "Sorry, you can't submit any answers right now, as the contest period is not the competition period.",
+            ephemeral=True)
 
 
 @tree.command(name="submit_all_answers",
@@ -594,18 +956,24 @@ async def answer_question(interaction, contest_name: str, question_number: int,
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def submit_team_answers(interaction, contest_name: str):
-    try:
-        contest = Contest.from_json(contest_name)
+    def submit_operation(contest: Contest) -> bool:
         player_team = contest.get_team_of_user(interaction.user.id)
         if player_team and player_team.owner_id == interaction.user.id:
             player_team.submit_answers()
-            contest.update_json()
-            await interaction.response.send_message("The owner has officially submitted all of their teams' answers!")
+            return True
+        return False
+
+    await defer_if_slow(interaction, contest_name)
+    try:
+        if await answer_queue.submit(contest_name, submit_operation):
+            await respond(
+                interaction, "The owner has officially submitted all of their teams' answers!")
         else:
-            await interaction.response.send_message(
-                "Sorry, you are not the owner, and thus you cannot submit any answers.")
+            await respond(
+                interaction, "Sorry, you are not the owner, and thus you cannot submit any answers.")
     except WrongPeriodException:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "Sorry, but you cannot submit any answers right now, as the contest is not in the competition period.")
 
 
@@ -615,16 +983,17 @@ async def submit_team_answers(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def show_questions_with_answers(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     question_string = ""
     for question in contest.questions:
         question_string += (f"Question {question.number}: answer = {question.correct_answer}, "
                             f"points = {question.point_value} \n")
     if question_string == "":
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "Hmm... There doesn't seem to be any questions in the contest currently. To add one, use /add_question.")
     else:
-        await interaction.response.send_message(question_string)
+        await respond(interaction, question_string)
 
 
 @tree.command(name="link",
@@ -632,11 +1001,11 @@ async def show_questions_with_answers(interaction, contest_name: str):
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def link(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     if contest.period == ContestPeriod.competition or contest.period == ContestPeriod.postCompetition:
-        await interaction.response.send_message(contest.link, ephemeral=True)
+        await respond(interaction, contest.link, ephemeral=True)
     else:
-        await interaction.response.send_message("Sorry, you cannot access this right now.", ephemeral=True)
+        await respond(interaction, "Sorry, you cannot access this right now.", ephemeral=True)
 
 
 @tree.command(name="change_link",
@@ -645,43 +1014,71 @@ async def link(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def change_link(interaction, contest_name: str, new_link: str):
-    contest = Contest.from_json(contest_name)
-    contest.link = new_link
-    contest.update_json()
-    await interaction.response.send_message("Link has been changed!")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        contest.link = new_link
+        await respond(interaction, "Link has been changed!")
 
 
 @tree.command(name="team_rankings",
               description="Gets the team rankings for the specified contest.",
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
-async def team_rankings(interaction, contest_name: str):
+async def team_rankings(interaction, contest_name: str, page: int = 1):
+    if page < 1:
+        await respond(interaction, "Pages start at 1.", ephemeral=True)
+        return
     try:
-        contest = Contest.from_json(contest_name)
+        contest = await get_contest(interaction, contest_name)
         rankings: list[str] = []
-        rank = 1
-        for team in contest.team_rankings:
+        rank = (page - 1) * RANKINGS_PAGE_SIZE + 1
+        for team in contest.get_ranked_teams(RANKINGS_PAGE_SIZE, start=rank - 1):
             rankings.append(f"Rank {rank}: {team.name}, total points = {team.total_points}.")
             rank += 1
-        await interaction.response.send_message("\n".join(rankings))
+        if len(rankings) == 0:
+            await respond(interaction, f"There are no teams on page {page}.", ephemeral=True)
+            return
+        await respond(interaction, "\n".join(rankings))
     except WrongPeriodException:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "The competition hasn't started yet, and thus there aren't any rankings. "
             "Use /all_teams instead to get a list of every team.")
 
 
+@tree.command(name="my_rank",
+              description="Gets the current rank of your team.",
+              guild=GUILD)
+@discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
+async def my_rank(interaction, contest_name: str):
+    try:
+        contest = await get_contest(interaction, contest_name)
+        team = contest.get_team_of_user(interaction.user.id)
+        if team is None:
+            await respond(interaction, "Hmmm... your team could not be found.", ephemeral=True)
+            return
+        await respond(
+            interaction,
+            f"Your team '{team.name}' is ranked {contest.get_rank_of_team(team)} out of {len(contest.teams)}, "
+            f"with {team.total_points} points.", ephemeral=True)
+    except WrongPeriodException:
+        await respond(
+            interaction, "The competition hasn't started yet, and thus there aren't any rankings.", ephemeral=True)
+
+
 @tree.command(name="show_teams",
               description="Shows all teams, and their members, within a contest.",
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def show_teams(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
+    names = await resolve_member_names(
+        interaction, [member_id for team in contest.teams for member_id in (team.owner_id, *team.member_ids)])
     team_blurbs: list[str] = []
     for team in contest.teams:
         team_blurbs.append(
-            f"Team '{team.name}', with owner '{member_id_to_name(interaction, team.owner_id)}' and members"
-            f" {[member_id_to_name(interaction, member_id) for member_id in team.member_ids]},")
-    await interaction.response.send_message("All teams: \n" + "\n".join(team_blurbs))
+            f"Team '{team.name}', with owner '{names[team.owner_id]}' and members"
+            f" {[names[member_id] for member_id in team.member_ids]},")
+    await respond(interaction, "All teams: \n" + "\n".join(team_blurbs))
 
 
 @tree.command(name="show_questions",
@@ -689,15 +1086,16 @@ async def show_teams(interaction, contest_name: str):
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def show_questions(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     questions_strings: list[str] = []
     for question in contest.questions:
         questions_strings.append(f"Question {question.number}: points = {question.point_value}")
     if len(questions_strings) == 0:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "There are no questions at the moment. The contest might still be in it's signup phase.", ephemeral=True)
     else:
-        await interaction.response.send_message("All questions: \n" + "\n".join(questions_strings))
+        await respond(interaction, "All questions: \n" + "\n".join(questions_strings))
 
 
 @tree.command(name="delete_contest",
@@ -706,8 +1104,10 @@ async def show_questions(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def delete_contest(interaction, contest_name: str):
-    Contest.delete_json(contest_name)
-    await interaction.response.send_message("Contest has been deleted!")
+    async with contests.lock(contest_name):
+        await contests.delete(contest_name)
+    await scheduler.unschedule(contest_name)
+    await respond(interaction, "Contest has been deleted!")
 
 
 @tree.command(name="remove_member_from_team",
@@ -716,18 +1116,16 @@ async def delete_contest(interaction, contest_name: str):
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def remove_member_from_team(interaction, contest_name: str, team_name: str, member: discord.Member):
-    contest: Contest = Contest.from_json(contest_name)
-    team = contest.get_team(team_name)
-    try:
-        team.remove_member(member.id)
-    except OwnerLeaveTeamException:
-        await interaction.user.send_message(
-            "You cannot remove an owner. Use /transfer_ownership to transfer ownership to someone else.",
-            ephemeral=True)
-    except MemberNotInTeamException:
-        await interaction.user.send_message("This member is not currently in the team.", ephemeral=True)
-    finally:
-        contest.update_json()
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        team = contest.get_team(team_name)
+        try:
+            team.remove_member(member.id)
+        except OwnerLeaveTeamException:
+            await interaction.user.send_message(
+                "You cannot remove an owner. Use /transfer_ownership to transfer ownership to someone else.",
+                ephemeral=True)
+        except MemberNotInTeamException:
+            await interaction.user.send_message("This member is not currently in the team.", ephemeral=True)
 
 
 @tree.command(name="unsubmit_answers_of_team",
@@ -736,12 +1134,10 @@ async def remove_member_from_team(interaction, contest_name: str, team_name: str
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 async def unsubmit_answers_of_team(interaction, contest_name: str, team_name: str):
-    contest: Contest = Contest.from_json(contest_name)
-    team: Team = contest.get_team(team_name)
-    team.answers_submitted = False
-    team.submit_ranking = 0
-    contest.update_json()
-    await interaction.response.send_message("Success!")
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        team: Team = contest.get_team(team_name)
+        team.unsubmit_answers()
+        await respond(interaction, "Success!")
 
 
 @tree.command(name="transfer_ownership_of_team",
@@ -750,19 +1146,20 @@ async def unsubmit_answers_of_team(interaction, contest_name: str, team_name: st
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 async def transfer_ownership_of_team(interaction, contest_name: str, team_name: str, new_owner: discord.Member):
-    try:
-        contest = Contest.from_json(contest_name)
-        player_team = contest.get_team(team_name)
-        if player_team is None:
-            await interaction.response.send_message("Hmmm... this team cannot be found", ephemeral=True)
-        else:
-            player_team.transfer_ownership(new_owner.id)
-            contest.update_json()
-            await interaction.response.send_message(f"Ownership has been successfully transferred to {new_owner}!")
-    except MemberNotInTeamException:
-        await interaction.response.send_message(
-            "The member that you tried to transfer ownership in is not in the team(or hasn't accepted the invite yet).",
-            ephemeral=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            player_team = contest.get_team(team_name)
+            if player_team is None:
+                await respond(interaction, "Hmmm... this team cannot be found", ephemeral=True)
+            else:
+                player_team.transfer_ownership(new_owner.id)
+                await respond(interaction, f"Ownership has been successfully transferred to {new_owner}!")
+        except MemberNotInTeamException:
+            await respond(
+                interaction,
+                "The member that you tried to transfer ownership in is not in the team"
+                "(or hasn't accepted the invite yet).",
+                ephemeral=True)
 
 
 @tree.command(name="add_member_to_team",
@@ -771,17 +1168,16 @@ async def transfer_ownership_of_team(interaction, contest_name: str, team_name:
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 async def add_member_to_team(interaction, contest_name: str, team_name: str, new_member: discord.Member):
-    contest = Contest.from_json(contest_name)
-    team = contest.get_team(team_name)
-    try:
-        team.register_member(new_member.id, ignore_invite=True)
-        contest.update_json()
-        await interaction.response.send_message("Success!")
-    except MemberInAnotherTeamException:
-        await interaction.response.send_message("This member is already in another team.", ephemeral=True)
-    except TeamSizeExceededException:
-        await interaction.response.send_message(
-            f"The team size limit of {contest.team_size_limit} has been exceeded.", ephemeral=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        team = contest.get_team(team_name)
+        try:
+            team.register_member(new_member.id, ignore_invite=True)
+            await respond(interaction, "Success!")
+        except MemberInAnotherTeamException:
+            await respond(interaction, "This member is already in another team.", ephemeral=True)
+        except TeamSizeExceededException:
+            await respond(
+                interaction, f"The team size limit of {contest.team_size_limit} has been exceeded.", ephemeral=True)
 
 
 @tree.command(name="submit_answers_for_team",
@@ -790,16 +1186,15 @@ async def add_member_to_team(interaction, contest_name: str, team_name: str, new
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def submit_answers_for_team(interaction, contest_name: str):
-    try:
-        contest = Contest.from_json(contest_name)
-        for team in contest.teams:
-            if not team.answers_submitted:
-                team.submit_answers()
-        contest.update_json()
-        await interaction.response.send_message("Success!")
-    except WrongPeriodException:
-        await interaction.response.send_message(
-            "The period must be ContestPeriod.Competition for this to work.", ephemeral=True)
+    async with contest_unit_of_work(interaction, contest_name) as contest:
+        try:
+            for team in contest.teams:
+                if not team.answers_submitted:
+                    team.submit_answers()
+            await respond(interaction, "Success!")
+        except WrongPeriodException:
+            await respond(
+                interaction, "The period must be ContestPeriod.Competition for this to work.", ephemeral=True)
 
 
 @tree.command(name="answer_question_for_team",
@@ -808,20 +1203,24 @@ async def submit_answers_for_team(interaction, contest_name: str):
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 async def answer_question_for_team(interaction, contest_name: str, team_name: str, question_number: int, answer: float):
+    def answer_operation(contest: Contest):
+        contest.get_team(team_name).answer(contest.get_question(question_number), answer, interaction.user.id)
+
+    await defer_if_slow(interaction, contest_name)
     try:
-        contest = Contest.from_json(contest_name)
-        team = contest.get_team(team_name)
-        team.answer(contest.get_question(question_number), answer)
-        contest.update_json()
-        await interaction.response.send_message(f"Question {question_number} for team {team_name} was answered.")
+        await answer_queue.submit(contest_name, answer_operation)
+        await respond(interaction, f"Question {question_number} for team {team_name} was answered.")
     except AnswersAlreadySubmittedException:
-        await interaction.response.send_message("Hmm... this team has already submitted their answers.", ephemeral=True)
+        await respond(
+            interaction, "Hmm... this team has already submitted their answers.", ephemeral=True)
     except WrongPeriodException:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "Sorry, you can't submit any answers right now, as the contest period is not the competition period.",
             ephemeral=True)
     except IndexError:
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "Sorry, but the contest doesn't have a problem with number " + str(question_number), ephemeral=True)
 
 
@@ -830,12 +1229,12 @@ async def answer_question_for_team(interaction, contest_name: str, team_name: st
               guild=GUILD)
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def answered_questions(interaction, contest_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     team = contest.get_team_of_user(interaction.user.id)
     if team:
-        await interaction.response.send_message(team.answering_status())
+        await respond(interaction, team.answering_status())
     else:
-        await interaction.response.send_message("Hmmm... your team could not be found.")
+        await respond(interaction, "Hmmm... your team could not be found.")
 
 
 @tree.command(name="show_answers_of_team",
@@ -844,12 +1243,12 @@ async def answered_questions(interaction, contest_name: str):
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion, team_name=all_team_names_autocompletion)
 async def answered_questions_admin(interaction, contest_name: str, team_name: str):
-    contest = Contest.from_json(contest_name)
+    contest = await get_contest(interaction, contest_name)
     team = contest.get_team(team_name)
     if team:
-        await interaction.response.send_message(team.answering_status(display_correct_answer=True))
+        await respond(interaction, team.answering_status(display_correct_answer=True))
     else:
-        await interaction.response.send_message("Hmmm... the team could not be found.")
+        await respond(interaction, "Hmmm... the team could not be found.")
 
 
 @tree.command(name="change_contest_name",
@@ -858,11 +1257,39 @@ async def answered_questions_admin(interaction, contest_name: str, team_name: st
 @discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
 @discord.app_commands.autocomplete(contest_name=contest_name_autocompletion)
 async def change_contest_name(interaction, contest_name: str, new_name: str):
-    contest = Contest.from_json(contest_name)
-    contest.name = new_name
-    contest.update_json()
-    Contest.delete_json(contest_name)
-    await interaction.response.send_message(f"Success! The name has been changed to {contest_name}")
+    # renaming replaces the contest's file, so it only needs the lock rather than a full unit of work.
+    async with contests.lock(contest_name):
+        await contests.rename(await contests.get(contest_name), new_name)
+    await scheduler.rename(contest_name, new_name)
+    await respond(interaction, f"Success! The name has been changed to {contest_name}")
+
+
+@tree.command(name="cache_stats",
+              description="[Mod Only] Shows how often contests were served from memory.",
+              guild=GUILD)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def cache_stats(interaction):
+    await respond(
+        interaction,
+        f"Contest cache: {contests.hits} hits, {contests.misses} misses "
+        f"({contests.hit_rate:.1%} hit rate). "
+        f"Answer queue: {answer_queue.operations} answer(s) written in {answer_queue.batches} batch(es) "
+        f"({answer_queue.average_batch_size:.1f} per batch). "
+        f"DMs: {outbox.sent} sent, {len(outbox.pending)} waiting, {len(outbox.dead_letters)} given up on.",
+        ephemeral=True)
+
+
+@tree.command(name="loop_stats",
+              description="[Mod Only] Shows how long the bot's event loop has been blocked for.",
+              guild=GUILD)
+@discord.app_commands.checks.has_any_role('Olympiad Team', 'Olympiad Manager')
+async def loop_stats(interaction):
+    await respond(
+        interaction,
+        f"Event loop lag: {loop_lag.mean_lag * 1000:.1f} ms on average, {loop_lag.max_lag * 1000:.0f} ms at most "
+        f"({loop_lag.recent_max_lag * 1000:.0f} ms at most recently). "
+        f"Blocked for {loop_lag.total_lag:.1f} s in total, with {loop_lag.stalls} stall(s) "
+        f"over {loop_lag.stall_threshold * 1000:.0f} ms.", ephemeral=True)
 
 
 @tree.command(name="sync",
@@ -887,3 +1314,5 @@ async def sync_commands_globally(interaction):
 # DO NOT DELETE THESE LINES OF CODE:
 # tree.add_command(db_group)
 client.run(os.environ['token'])
+# writes any changes that are still waiting to be flushed once the bot shuts down.
+contests.flush_blocking()
@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+import discord
+
+
+# one discord api call to make as part of a bulk operation.
+# route groups the calls that share a discord rate limit bucket(e.g. "add_roles" or "create_text_channel");
+# call creates the coroutine, so that it can be created again when the call is retried.
+class BulkAction:
+    def __init__(self, route: str, call: Callable[[], Awaitable[Any]], label: str = ""):
+        self.route = route
+        self.call = call
+        self.label = label
+
+
+class BulkResult:
+    def __init__(self):
+        # maps the index of each action that succeeded to what its call returned.
+        self.results: dict[int, Any] = {}
+        self.failures: list[tuple[BulkAction, Exception]] = []
+        self.retries = 0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.results)
+
+
+# the calls of each route wait here while the route is rate limited.
+class _RouteBucket:
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.blocked_until = 0.0
+
+    async def wait_until_unblocked(self):
+        while (delay := self.blocked_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+
+# how long discord asked us to wait, if the error is a rate limit.
+def _retry_after(error: Exception) -> float | None:
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    if isinstance(error, discord.HTTPException) and error.status == 429:
+        retry_after = error.response.headers.get("Retry-After") if error.response is not None else None
+        return float(retry_after) if retry_after else 1.0
+    return None
+
+
+# runs many discord api calls at once(for instance, creating a channel for every team), instead of one at a time.
+# at most max_concurrency calls run at the same time, and at most route_concurrency of them share a route.
+# discord.py already waits out most rate limits on its own; when a call still fails with a 429, its whole
+# route is paused for as long as discord asked, and the call is retried. server errors are retried with
+# exponential backoff, and any other error is recorded as a failure without stopping the other calls.
+class BulkExecutor:
+    def __init__(self, max_concurrency: int = 8, route_concurrency: int = 4, max_retries: int = 5,
+                 base_backoff: float = 1.0, progress_interval: float = 2.0):
+        self.max_concurrency = max_concurrency
+        self.route_concurrency = route_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        # progress is reported at most once every progress_interval seconds(and once at the end).
+        self.progress_interval = progress_interval
+        self._buckets: dict[str, _RouteBucket] = {}
+
+    def _bucket(self, route: str) -> _RouteBucket:
+        if route not in self._buckets:
+            self._buckets[route] = _RouteBucket(self.route_concurrency)
+        return self._buckets[route]
+
+    # progress is called with (finished actions, total actions).
+    async def run(self, actions: list[BulkAction],
+                  progress: Callable[[int, int], Awaitable[None]] | None = None) -> BulkResult:
+        result = BulkResult()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        finished = 0
+        last_report = time.monotonic()
+
+        async def run_action(index: int, action: BulkAction):
+            nonlocal finished, last_report
+            try:
+                result.results[index] = await self._call_with_retries(action, result, semaphore)
+            except Exception as error:
+                result.failures.append((action, error))
+            finished += 1
+            if progress is not None and time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                await progress(finished, len(actions))
+
+        await asyncio.gather(*(run_action(index, action) for index, action in enumerate(actions)))
+        if progress is not None and actions:
+            await progress(finished, len(actions))
+        return result
+
+    # semaphore limits the calls of the whole run; it's only held during the call itself, so that calls that are
+    # waiting out a rate limit or a backoff never keep the calls of other routes from running.
+    async def _call_with_retries(self, action: BulkAction, result: BulkResult, semaphore: asyncio.Semaphore) -> Any:
+        bucket = self._bucket(action.route)
+        attempt = 0
+        while True:
+            await bucket.wait_until_unblocked()
+            async with bucket.semaphore, semaphore:
+                try:
+                    return await action.call()
+                except (discord.HTTPException, discord.RateLimited) as error:
+                    retry_after = _retry_after(error)
+                    if attempt >= self.max_retries or (
+                            retry_after is None and not isinstance(error, discord.DiscordServerError)):
+                        raise
+                    if retry_after is not None:
+                        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+                        delay = 0.0
+                    else:
+                        # jitter keeps the retries of many calls from hitting the server at the same moment.
+                        delay = self.base_backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            attempt += 1
+            result.retries += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,33 @@
+# turns contests(in dict form) into bytes and back.
+# contests are written as compact json by default, since indentation made up most of the size of the
+# old files; pretty=True gives the old, human readable format instead.
+# orjson is used when it's installed, as it's several times faster than the json module.
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode(data: dict, pretty: bool = False) -> bytes:
+    if pretty:
+        return json.dumps(data, indent=6).encode()
+    if orjson is not None:
+        # answers are keyed by question id, which orjson only accepts with OPT_NON_STR_KEYS.
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def decode(raw: bytes | str) -> dict:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# json turns the question ids that answers are keyed by into strings;
+# this turns them back into ints, in place.
+def normalize_contest_data(data: dict) -> dict:
+    for team in data["teams"]:
+        team["answers"] = {int(question_id): answer for question_id, answer in team["answers"].items()}
+    return data
@@ -1,11 +1,14 @@
-import json
-import os
+from datetime import datetime, timezone
 from typing import Self
 
+from conteststore import ContestStore, JsonContestStore
+from nameindex import NameIndex
 from question import Question
+from scoring import Scoreboard
 from team import Team
 from exceptions import (
     MemberInAnotherTeamException,
+    TeamImportException,
     TeamNameException,
     TeamNotInContestException,
     WrongPeriodException
@@ -13,14 +16,10 @@ from exceptions import (
 from contestperiod import ContestPeriod
 
 
-def _contest_name_to_path(contest_name: str) -> str:
-    return "data/" + contest_name + ".json"
-
-
-_GENERAL_DATA_FILE_PATH = "data/generalContestInfo.json"
-
-
 class Contest:
+    # where contests are loaded from and saved to; see conteststore.py.
+    store: ContestStore = JsonContestStore()
+
     # Here, questions and teams represent the questions and teams in dict form.
     def __init__(self, name: str, link: str, team_size_limit: int | None = None):
         self.name = name
@@ -29,19 +28,38 @@ class Contest:
         # used to keep track who submitted first, second, third, etc.
         self.team_submit_order: int = 1
         # used to keep track of which period the contest is currently in
-        self.period: ContestPeriod = ContestPeriod.preSignup
+        self._period: ContestPeriod = ContestPeriod.preSignup
         self.questions: list[Question] = []
+        # questions by their id, and the number(position) of each question by its id.
+        # the numbers are only recomputed when a question is added or removed.
+        self._questions_by_id: dict[int, Question] = {}
+        self._question_numbers: dict[int, int] = {}
+        self.next_question_id = 1
         self.teams: list[Team] = []
+        self.scoreboard = Scoreboard(self)
+        # indexes that make looking up the team(s) of a member O(1).
+        # they are kept in sync by the team-related methods of Contest and Team.
+        self._member_teams: dict[int, Team] = {}
+        self._invited_teams: dict[int, set[Team]] = {}
+        # maps normalized(casefolded) team names to teams, so that names are unique regardless of case.
+        self._teams_by_name: dict[str, Team] = {}
+        # used for team name autocompletion.
+        self.team_name_index = NameIndex()
+        # domain events(a team registered, a question was answered, etc.) that happened since the contest
+        # was last saved. stores that keep a journal(see journal.py) append these instead of rewriting
+        # the whole contest.
+        self.pending_events: list[dict] = []
 
-    @staticmethod
-    def all_names() -> list[str]:
-        with open(_GENERAL_DATA_FILE_PATH, 'r') as file:
-            return json.load(file)['allContestNames']
+    @classmethod
+    def all_names(cls) -> list[str]:
+        return cls.store.all_names()
 
     @classmethod
     def from_json(cls, contest_name: str) -> Self:
-        with open(_contest_name_to_path(contest_name), 'r') as file:
-            contest_data = json.load(file)
+        return cls.from_data(cls.store.load(contest_name))
+
+    @classmethod
+    def from_data(cls, contest_data: dict) -> Self:
         contest_info = contest_data['info']
         question_data_list = contest_data['questions']
         team_data_list = contest_data['teams']
@@ -55,31 +73,55 @@ class Contest:
         # it"ll return ContestPeriod.preSignup, the enum that we want.
         contest.period = ContestPeriod[contest_info["period"]]
         contest.questions = [
-            Question.from_data(contest, data)
-            for data in question_data_list
-        ]
-        contest.teams = [
-            Team.from_data(contest, data)
-            for data in team_data_list
+            Question.from_data(contest, data, question_number)
+            for question_number, data in enumerate(question_data_list, start=1)
         ]
+        contest._reindex_questions()
+        contest.next_question_id = contest_info.get(
+            "nextQuestionID", max(contest._questions_by_id, default=0) + 1)
+        for data in team_data_list:
+            team = Team.from_data(contest, data)
+            contest.teams.append(team)
+            contest._index_team(team)
+        contest.scoreboard.rebuild()
+        # loading the contest isn't something that happened to it.
+        contest.pending_events.clear()
         return contest
 
-    @staticmethod
-    def delete_json(contest_name: str):
-        os.remove(_contest_name_to_path(contest_name))
-        with open(_GENERAL_DATA_FILE_PATH, 'r') as file:
-            contest_info = json.load(file)
-            contest_info['allContestNames'].remove(contest_name)
-        with open(_GENERAL_DATA_FILE_PATH, 'w') as file:
-            json.dump(contest_info, file, indent=6)
-
-    def update_json(self):
-        with open(_GENERAL_DATA_FILE_PATH, 'r') as file:
-            data = json.load(file)
-        if self.name not in data['allContestNames']:
-            data['allContestNames'].append(self.name)
-            with open(_GENERAL_DATA_FILE_PATH, 'w') as file:
-                json.dump(data, file, indent=6)
+    @classmethod
+    def delete_json(cls, contest_name: str):
+        cls.store.delete(contest_name)
+
+    # register_name can be set to False when the contest is already known to be listed
+    # within the store(for instance, when it was loaded from it), which saves a lookup on every save.
+    def update_json(self, register_name: bool = True):
+        self.store.save(self.name, self.data, register_name, self.pending_events)
+        self.pending_events = []
+
+    def record_event(self, event_type: str, **fields):
+        self.pending_events.append({"type": event_type, "at": datetime.now(timezone.utc).isoformat(), **fields})
+
+    # events of teams that haven't been added yet are skipped; adding the team records all of it at once.
+    def record_team_event(self, team: Team, event_type: str, **fields):
+        if self._has_team(team):
+            self.record_event(event_type, team=team.name, **fields)
+
+    @property
+    def period(self) -> ContestPeriod:
+        return self._period
+
+    @period.setter
+    def period(self, period: ContestPeriod):
+        self._period = period
+        self.record_event("PeriodChanged", period=period.name)
+
+    @property
+    def data(self) -> dict:
+        return {**self.data_without_teams, "teams": [team.data for team in self.teams]}
+
+    # the info and questions of the contest, which stay small no matter how many teams registered.
+    @property
+    def data_without_teams(self) -> dict:
         # when we do str(contest.period), it will return ContestPeriod.(SomePeriod)
         # str(contest.period)[contest.period.index(".")+1:] makes it return only the period name.
         # for example, ContestPeriod.preSignup would turn into preSignup.
@@ -88,95 +130,246 @@ class Contest:
             "link": self.link,
             "name": self.name,
             "period": str(self.period)[str(self.period).index(".") + 1:],
-            "teamSubmitOrder": self.team_submit_order
+            "teamSubmitOrder": self.team_submit_order,
+            "nextQuestionID": self.next_question_id
         }
         question_data_list = [question.data for question in self.questions]
-        team_data_list = [team.data for team in self.teams]
-        with open(_contest_name_to_path(self.name), 'w') as file:
-            json.dump({"info": contest_info, "questions": question_data_list, "teams": team_data_list}, file, indent=6)
+        return {"info": contest_info, "questions": question_data_list}
 
     @property
     def registered_member_ids(self) -> list[int]:
-        ids = []
-        for team in self.teams:
-            for member_id in team.member_ids + [team.owner_id]:
-                if member_id not in ids:
-                    ids.append(member_id)
-        return ids
+        return list(self._member_teams)
 
     @property
     def invited_member_ids(self) -> list[int]:
-        ids = []
-        for team in self.teams:
-            for member_id in team.invited_member_ids:
-                if member_id not in ids:
-                    ids.append(member_id)
-        return ids
+        return list(self._invited_teams)
+
+    @staticmethod
+    def _normalize_team_name(team_name: str) -> str:
+        return team_name.casefold()
+
+    def _index_team(self, team: Team):
+        self._teams_by_name[self._normalize_team_name(team.name)] = team
+        self.team_name_index.add(team.name)
+        for member_id in (*team.member_ids, team.owner_id):
+            self._member_teams[member_id] = team
+        for member_id in team.invited_member_ids:
+            self._invited_teams.setdefault(member_id, set()).add(team)
+
+    def _unindex_team(self, team: Team):
+        self._teams_by_name.pop(self._normalize_team_name(team.name), None)
+        self.team_name_index.remove(team.name)
+        for member_id in (*team.member_ids, team.owner_id):
+            if self._member_teams.get(member_id) is team:
+                del self._member_teams[member_id]
+        for member_id in team.invited_member_ids:
+            self.unindex_invite(member_id, team)
+
+    # a team is within the contest exactly when its owner is indexed to it;
+    # teams that haven't been added yet are indexed all at once by add_team.
+    def _has_team(self, team: Team) -> bool:
+        return self._member_teams.get(team.owner_id) is team
+
+    # the following are called by Team whenever its members or invitations change.
+    def index_member(self, member_id: int, team: Team):
+        if self._has_team(team):
+            self._member_teams[member_id] = team
+
+    def unindex_member(self, member_id: int, team: Team):
+        if self._member_teams.get(member_id) is team:
+            del self._member_teams[member_id]
+
+    def index_invite(self, member_id: int, team: Team):
+        if self._has_team(team):
+            self._invited_teams.setdefault(member_id, set()).add(team)
+
+    def unindex_invite(self, member_id: int, team: Team):
+        teams = self._invited_teams.get(member_id)
+        if teams is not None:
+            teams.discard(team)
+            if not teams:
+                del self._invited_teams[member_id]
 
     @property
     def team_rankings(self) -> list[Team]:
+        return self.get_ranked_teams()
+
+    # returns amount teams(or all of them), starting from the team ranked at start + 1.
+    # the teams are kept in order by the scoreboard's leaderboard, so nothing has to be sorted here.
+    def get_ranked_teams(self, amount: int | None = None, start: int = 0) -> list[Team]:
         if self.period == ContestPeriod.competition or self.period == ContestPeriod.postCompetition:
-            # note: the team ranking is negated here because it's sorting by reverse:
-            # the higher the key, the farther up it appears.
-            return sorted(self.teams, reverse=True, key=lambda team: (team.total_points, -team.submit_ranking))
+            return self.scoreboard.leaderboard.top(amount, start)
         else:
             raise WrongPeriodException(ContestPeriod.competition, ContestPeriod.postCompetition)
 
+    def get_rank_of_team(self, team: Team) -> int:
+        if self.period == ContestPeriod.competition or self.period == ContestPeriod.postCompetition:
+            return self.scoreboard.leaderboard.rank_of(team)
+        else:
+            raise WrongPeriodException(ContestPeriod.competition, ContestPeriod.postCompetition)
+
+    def _reindex_questions(self):
+        self._questions_by_id = {question.id: question for question in self.questions}
+        self._question_numbers = {question.id: number for number, question in enumerate(self.questions, start=1)}
+
+    # since answers are keyed by question id, adding or removing a question doesn't move any answer
+    # onto another question; only the scores given by that question change.
     def add_question(self, question: Question, question_number: int | None = None):
         if self.period == ContestPeriod.preSignup or self.period == ContestPeriod.signup:
+            if question.id is None:
+                question.id = self.next_question_id
+            self.next_question_id = max(self.next_question_id, question.id + 1)
             if question_number is None:
                 self.questions.append(question)
             else:
                 self.questions.insert(question_number - 1, question)
+            self._reindex_questions()
+            self.scoreboard.add_question(question)
+        else:
+            raise WrongPeriodException(ContestPeriod.preSignup, ContestPeriod.signup)
+
+    # adds several new questions at the end, in order; the question indexes are only rebuilt once.
+    def add_questions(self, questions: list[Question]):
+        if self.period == ContestPeriod.preSignup or self.period == ContestPeriod.signup:
+            for question in questions:
+                question.id = self.next_question_id
+                self.next_question_id += 1
+            self.questions.extend(questions)
+            self._reindex_questions()
+            for question in questions:
+                self.scoreboard.add_question(question)
         else:
             raise WrongPeriodException(ContestPeriod.preSignup, ContestPeriod.signup)
 
     def remove_question(self, identifier: Question | int):
         if self.period == ContestPeriod.preSignup or self.period == ContestPeriod.signup:
-            if isinstance(identifier, Question):
-                self.questions.remove(identifier)
-            else:
-                # identifier now represents a question number instead
-                self.questions.pop(identifier - 1)
+            # identifier can also be a question number
+            question = identifier if isinstance(identifier, Question) else self.get_question(identifier)
+            self.scoreboard.remove_question(question)
+            self.questions.remove(question)
+            self._reindex_questions()
         else:
             raise WrongPeriodException(ContestPeriod.preSignup, ContestPeriod.signup)
 
     def get_question(self, question_number: int) -> Question:
         return self.questions[question_number - 1]
 
+    # returns None if the question was removed.
+    def get_question_by_id(self, question_id: int) -> Question | None:
+        return self._questions_by_id.get(question_id)
+
+    def number_of_question(self, question: Question) -> int:
+        if self._questions_by_id.get(question.id) is not question:
+            raise ValueError("The question isn't part of the contest.")
+        return self._question_numbers[question.id]
+
     def add_team(self, new_team: Team):
         if self.period == ContestPeriod.signup:
-            for team in self.teams:
-                if team.name == new_team.name:
-                    raise TeamNameException
-            for memberID in new_team.member_ids + [new_team.owner_id]:
-                if memberID in self.registered_member_ids:
+            if self.team_name_taken(new_team.name):
+                raise TeamNameException
+            for memberID in (*new_team.member_ids, new_team.owner_id):
+                if memberID in self._member_teams:
                     raise MemberInAnotherTeamException
             self.teams.append(new_team)
+            self._index_team(new_team)
+            self.scoreboard.add_team(new_team)
+            self.record_event("TeamRegistered", team=new_team.data)
         else:
             raise WrongPeriodException(ContestPeriod.signup)
 
+    # adds several teams(with their members already in member_ids) at once.
+    # the whole batch is checked against the name and member indexes first, and every conflict is reported
+    # in a single TeamImportException; if there is any, no team is added.
+    def add_teams(self, new_teams: list[Team]):
+        if self.period != ContestPeriod.signup:
+            raise WrongPeriodException(ContestPeriod.signup)
+        problems: list[str] = []
+        batch_names: set[str] = set()
+        batch_members: dict[int, str] = {}
+        for team in new_teams:
+            normalized_name = self._normalize_team_name(team.name)
+            if self.team_name_taken(team.name):
+                problems.append(f"a team named '{team.name}' already exists")
+            elif normalized_name in batch_names:
+                problems.append(f"'{team.name}' is listed more than once")
+            batch_names.add(normalized_name)
+            people = (team.owner_id, *team.member_ids)
+            if self.exceeds_team_size_limit(len(people)):
+                problems.append(f"'{team.name}' has {len(people)} members, but the limit is {self.team_size_limit}")
+            for member_id in people:
+                existing_team = self._member_teams.get(member_id)
+                if existing_team is not None:
+                    problems.append(f"<@{member_id}> (listed in '{team.name}') is already in '{existing_team.name}'")
+                elif batch_members.get(member_id) == team.name:
+                    problems.append(f"<@{member_id}> is listed more than once in '{team.name}'")
+                elif member_id in batch_members:
+                    problems.append(
+                        f"<@{member_id}> is listed in both '{batch_members[member_id]}' and '{team.name}'")
+                else:
+                    batch_members[member_id] = team.name
+        if problems:
+            raise TeamImportException(*problems)
+        for team in new_teams:
+            self.add_team(team)
+
+    # the team size limit counts every member of a team, including its owner.
+    def exceeds_team_size_limit(self, team_size: int) -> bool:
+        return bool(self.team_size_limit) and team_size > self.team_size_limit
+
     def remove_team(self, identifier: Team | str):
         team = identifier if isinstance(identifier, Team) else self.get_team(team_name=identifier)
         self.teams.remove(team)
+        self._unindex_team(team)
+        self.scoreboard.remove_team(team)
+        self.record_event("TeamRemoved", team=team.name)
 
     def get_team(self, team_name: str) -> Team:
-        for team in self.teams:
-            if team.name.lower() == team_name.lower():
-                return team
-        raise TeamNotInContestException
+        team = self._teams_by_name.get(self._normalize_team_name(team_name))
+        if team is None:
+            raise TeamNotInContestException
+        return team
+
+    def team_name_taken(self, team_name: str) -> bool:
+        return self._normalize_team_name(team_name) in self._teams_by_name
+
+    def rename_team(self, team: Team, new_name: str):
+        normalized_name = self._normalize_team_name(new_name)
+        # a team is allowed to change the case of its own name.
+        if self._teams_by_name.get(normalized_name, team) is not team:
+            raise TeamNameException
+        self._teams_by_name.pop(self._normalize_team_name(team.name), None)
+        self.team_name_index.remove(team.name)
+        self.record_event("TeamRenamed", team=team.name, newName=new_name)
+        team.name = new_name
+        self._teams_by_name[normalized_name] = team
+        self.team_name_index.add(new_name)
 
     def get_team_of_user(self, user_id: int) -> Team | None:
-        for team in self.teams:
-            if team.member_in_team(user_id):
-                return team
-        return None
+        return self._member_teams.get(user_id)
+
+    def get_teams_inviting_user(self, user_id: int) -> set[Team]:
+        return self._invited_teams.get(user_id, set())
+
+    def search_team_names(self, current: str, limit: int) -> list[str]:
+        return self.team_name_index.search(current, limit)
+
+    # the names of the teams that the user owns or was invited to, that contain current.
+    # these come straight from the member and invitation indexes, so no other team is looked at.
+    def search_team_names_of_user(self, user_id: int, current: str, limit: int) -> list[str]:
+        teams = set(self.get_teams_inviting_user(user_id))
+        own_team = self.get_team_of_user(user_id)
+        if own_team is not None and own_team.owner_id == user_id:
+            teams.add(own_team)
+        query = current.casefold()
+        names = [team.name for team in teams if query in team.name.casefold()]
+        names.sort(key=lambda name: (not name.casefold().startswith(query), name.casefold()))
+        return names[:limit]
 
     def get_winner(self) -> Team | None:
         if self.period == ContestPeriod.competition or self.period == ContestPeriod.postCompetition:
-            top_ranked_team = self.team_rankings[0]
-            if top_ranked_team.answers_submitted:
-                return top_ranked_team
+            top_ranked_teams = self.get_ranked_teams(1)
+            if top_ranked_teams and top_ranked_teams[0].answers_submitted:
+                return top_ranked_teams[0]
             else:
                 return None
         else:
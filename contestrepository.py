@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from contest import Contest
+from journal import apply_events
+from nameindex import NameIndex
+
+# how long loading a contest is assumed to take(in seconds) before it has been loaded once.
+DEFAULT_LOAD_ESTIMATE = 1.0
+
+
+# keeps live Contest objects in memory, so that commands (and autocompletion)
+# don't have to re-parse the contest file every time they are called.
+# loading and saving contests happens in a worker thread, so that reading or writing a large contest
+# never blocks the event loop(and with it, discord heartbeats and every other command).
+class ContestRepository:
+    # if flush_interval is None, every save is written to the store right away.
+    # otherwise, saves only mark the contest as dirty, and all dirty contests are written
+    # together at most once every flush_interval seconds(write-behind).
+    def __init__(self, max_cached_contests: int = 8, flush_interval: float | None = None):
+        self.max_cached_contests = max_cached_contests
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        # maps a contest name to (contest, signature of the stored contest when it was loaded/saved).
+        # an OrderedDict is used so that the least recently used contest can be evicted first.
+        self._cache: OrderedDict[str, tuple[Contest, tuple]] = OrderedDict()
+        # contests with unflushed changes. these stay here even if they are evicted from the cache,
+        # so evicting a contest never has to wait for it to be written.
+        self._dirty: dict[str, Contest] = {}
+        # contests that are being written by a worker thread right now.
+        self._writing: dict[str, Contest] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._catalog: NameIndex | None = None
+        # loads that are in progress, so that commands asking for the same contest share a single load.
+        self._loading: dict[str, asyncio.Future] = {}
+        # how long the last load of each contest took; used to predict which commands will be slow.
+        self._load_durations: dict[str, float] = {}
+        # stores keep state of their own(see journal.py and SqliteContestStore), so only one
+        # worker thread may use the store at a time. asyncio.Lock is fair, so writes happen in the
+        # order they were requested.
+        self._store_lock = asyncio.Lock()
+
+    # the names of every contest, loaded from the store once,
+    # then kept up to date whenever a contest is added, renamed or deleted.
+    @property
+    def catalog(self) -> NameIndex:
+        if self._catalog is None:
+            self._catalog = NameIndex(Contest.all_names())
+        return self._catalog
+
+    def exists(self, contest_name: str) -> bool:
+        return contest_name in self.catalog
+
+    def search_names(self, current: str, limit: int) -> list[str]:
+        return self.catalog.search(current, limit)
+
+    # a guess of how long get() will take, in seconds: nothing if the contest is in memory,
+    # otherwise about as long as it took to load the last time.
+    def predicted_load_time(self, contest_name: str) -> float:
+        if contest_name in self._cache or contest_name in self._dirty or contest_name in self._writing:
+            return 0.0
+        return self._load_durations.get(contest_name, DEFAULT_LOAD_ESTIMATE)
+
+    async def get(self, contest_name: str) -> Contest:
+        # unflushed changes always win over the store; and while a contest is being written,
+        # the store is halfway between two versions of it, so the live contest is used as well.
+        live_contest = self._dirty.get(contest_name) or self._writing.get(contest_name)
+        if live_contest is not None:
+            if contest_name in self._cache:
+                self._cache.move_to_end(contest_name)
+            else:
+                self._cache_contest(live_contest, ())
+            self.hits += 1
+            return live_contest
+        cached = self._cache.get(contest_name)
+        # if the stored contest was changed by something other than the bot(for instance, its file
+        # was edited by hand), the cached contest is stale and has to be loaded again.
+        if cached is not None and cached[1] == await asyncio.to_thread(Contest.store.signature, contest_name):
+            self._cache.move_to_end(contest_name)
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        loading = self._loading.get(contest_name)
+        if loading is None:
+            loading = self._loading[contest_name] = asyncio.ensure_future(self._load(contest_name))
+            loading.add_done_callback(lambda _: self._loading.pop(contest_name, None))
+        # shielded, so that a command being cancelled doesn't cancel the load for the other commands waiting on it.
+        return await asyncio.shield(loading)
+
+    async def _load(self, contest_name: str) -> Contest:
+        start = time.perf_counter()
+        contest, signature = await self._run_in_store_thread(self._load_from_store, contest_name)
+        self._load_durations[contest_name] = time.perf_counter() - start
+        self._cache_contest(contest, signature)
+        return contest
+
+    # every command that modifies a contest goes through this lock, so that two
+    # mutations of the same contest can never interleave at an await point.
+    # different contests have different locks, so they can still be modified in parallel.
+    def lock(self, contest_name: str) -> asyncio.Lock:
+        if contest_name not in self._locks:
+            self._locks[contest_name] = asyncio.Lock()
+        return self._locks[contest_name]
+
+    # loads the contest, hands it to the body of the with statement, then saves it.
+    # if the body raises an exception, whatever it changed so far is rolled back; see _roll_back.
+    # read-only commands should simply use get() instead, which never waits on the lock.
+    @asynccontextmanager
+    async def unit_of_work(self, contest_name: str):
+        async with self.lock(contest_name):
+            contest = await self.get(contest_name)
+            # a contest with changes that aren't in the store yet can't simply be loaded again to undo the body.
+            # the changes to its teams are in its pending events, which can be replayed onto the stored contest,
+            # but the rest(info and questions) isn't, so that part is copied first; it's small, unlike the teams.
+            # every other contest is the same as the stored one.
+            snapshot = contest.data_without_teams if contest_name in self._dirty else None
+            event_count = len(contest.pending_events)
+            try:
+                yield contest
+            except BaseException:
+                await self._roll_back(contest, snapshot, event_count)
+                raise
+            await self.save(contest)
+
+    # the cached contest was changed in place by a unit of work that failed halfway(e.g. a team was added, but
+    # one of its members couldn't be registered). it can't be used anymore, since the next unit of work would
+    # save it along with its own changes; so it's replaced by the contest as it was before.
+    async def _roll_back(self, contest: Contest, snapshot: dict | None, event_count: int):
+        self.invalidate(contest.name)
+        if snapshot is None:
+            # the next get() loads the stored contest again.
+            return
+        events = contest.pending_events[:event_count]
+        restored = await self._run_in_store_thread(self._restore_from_store, contest.name, snapshot, events)
+        await self.save(restored)
+
+    async def save(self, contest: Contest):
+        if self.flush_interval is None:
+            await self._write(contest)
+            return
+        self._mark_dirty(contest)
+
+    def _mark_dirty(self, contest: Contest):
+        self._dirty[contest.name] = contest
+        if self.flush_interval is not None and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    # writes the contest to the store right away, regardless of flush_interval.
+    # if the write fails, the contest is kept as dirty so that the next flush tries again.
+    async def save_now(self, contest: Contest):
+        self._dirty.pop(contest.name, None)
+        try:
+            await self._write(contest)
+        except Exception:
+            self._mark_dirty(contest)
+            raise
+
+    # writes dirty contests to the store right away.
+    # should be called on period changes, so that they are never lost.
+    # a contest that fails to be written is kept as dirty(like in save_now) and logged, and the other contests
+    # are still written; the first error is raised once they all have been tried.
+    async def flush(self, contest_name: str | None = None):
+        names = list(self._dirty) if contest_name is None else [contest_name]
+        first_error: Exception | None = None
+        for name in names:
+            # see _write.
+            async with self.lock(name):
+                contest = self._dirty.pop(name, None)
+                if contest is None:
+                    continue
+                try:
+                    await self._write(contest)
+                except Exception as error:
+                    logging.exception(f"Could not write the contest {name}.")
+                    self._dirty[name] = contest
+                    first_error = first_error or error
+        if first_error is not None:
+            raise first_error
+
+    # the same as flush(), for when the event loop isn't running anymore(i.e. once the bot shut down).
+    def flush_blocking(self):
+        for contest in self._dirty.values():
+            contest.update_json(register_name=False)
+        self._dirty.clear()
+
+    # contests saved while a flush is running(it waits on every write) are written by the next round,
+    # since save() only starts a new task once this one is done.
+    # contests that couldn't be written are tried again every flush_interval seconds.
+    async def _flush_later(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # already logged by flush().
+                pass
+
+    async def add(self, contest: Contest):
+        # see _write.
+        async with self.lock(contest.name):
+            await self._write(contest, register_name=True)
+        self.catalog.add(contest.name)
+
+    # should be called while holding the lock of the contest's current name.
+    async def rename(self, contest: Contest, new_name: str):
+        previous_name = contest.name
+        if new_name == previous_name:
+            return
+        self._dirty.pop(previous_name, None)
+        contest.name = new_name
+        await self.add(contest)
+        await self.delete(previous_name)
+
+    async def delete(self, contest_name: str):
+        self._dirty.pop(contest_name, None)
+        self.invalidate(contest_name)
+        await self._run_in_store_thread(Contest.delete_json, contest_name)
+        self.catalog.remove(contest_name)
+
+    def invalidate(self, contest_name: str):
+        self._cache.pop(contest_name, None)
+
+    # contests in the repository were either loaded from the store or added through add(),
+    # so their name is usually already registered within it.
+    # the contest is turned into a dict in the worker thread, since that takes long enough for a large contest
+    # to stall the event loop. so this must only be called while holding the contest's lock: commands only
+    # modify a contest while holding it, so the worker thread never sees a contest that's halfway modified.
+    async def _write(self, contest: Contest, register_name: bool = False):
+        self._writing[contest.name] = contest
+        try:
+            signature = await self._run_in_store_thread(self._save_to_store, contest, register_name)
+        finally:
+            self._writing.pop(contest.name, None)
+        self._cache_contest(contest, signature)
+
+    async def _run_in_store_thread(self, function, *args):
+        async with self._store_lock:
+            return await asyncio.to_thread(function, *args)
+
+    # the following two run in a worker thread.
+    @staticmethod
+    def _load_from_store(contest_name: str) -> tuple[Contest, tuple]:
+        signature = Contest.store.signature(contest_name)
+        return Contest.from_json(contest_name), signature
+
+    # the stored contest, with the changes that weren't saved yet(see unit_of_work) put back on top of it.
+    @staticmethod
+    def _restore_from_store(contest_name: str, snapshot: dict, events: list[dict]) -> Contest:
+        document = Contest.store.load(contest_name)
+        apply_events(document, events)
+        document.update(snapshot)
+        restored = Contest.from_data(document)
+        # they still have to be saved.
+        restored.pending_events = events
+        return restored
+
+    @staticmethod
+    def _save_to_store(contest: Contest, register_name: bool) -> tuple:
+        data, events = contest.data, contest.pending_events
+        contest.pending_events = []
+        try:
+            Contest.store.save(contest.name, data, register_name, events)
+        except BaseException:
+            # the events weren't written, so they're kept for the next save.
+            contest.pending_events[:0] = events
+            raise
+        return Contest.store.signature(contest.name)
+
+    def _cache_contest(self, contest: Contest, signature: tuple):
+        self._cache[contest.name] = (contest, signature)
+        self._cache.move_to_end(contest.name)
+        while len(self._cache) > self.max_cached_contests:
+            self._cache.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
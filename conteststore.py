@@ -0,0 +1,261 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import codec
+
+
+# where contests are persisted. Contest.from_json, update_json and delete_json all go through
+# Contest.store, so the backend can be swapped without touching the rest of the bot.
+# contests are passed around in the same dict form as their json files:
+# {"info": {...}, "questions": [...], "teams": [...]}
+class ContestStore(ABC):
+    @abstractmethod
+    def all_names(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def load(self, contest_name: str) -> dict:
+        pass
+
+    # register_name can be set to False when the contest is already known to be listed
+    # within the store(for instance, when it was loaded from it).
+    # events are the domain events that happened since the last save(see Contest.record_event);
+    # stores that don't keep a journal can ignore them.
+    @abstractmethod
+    def save(self, contest_name: str, data: dict, register_name: bool = True, events: list[dict] = ()):
+        pass
+
+    @abstractmethod
+    def delete(self, contest_name: str):
+        pass
+
+    # a value that changes whenever the stored contest changes; used to tell when a cached contest is stale.
+    @abstractmethod
+    def signature(self, contest_name: str) -> tuple:
+        pass
+
+
+# writes to a temporary file first, then renames it over the original one.
+# this way, a crash halfway through a write can never leave a half-written contest file behind.
+def write_atomic(path: str, raw: bytes):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(raw)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+# one json file per contest, plus generalContestInfo.json which lists every contest.
+# files are written compactly unless pretty is True; see codec.py.
+class JsonContestStore(ContestStore):
+    def __init__(self, directory: str = "data", pretty: bool = False):
+        self.directory = directory
+        self.pretty = pretty
+
+    def _read(self, path: str) -> dict:
+        with open(path, 'rb') as file:
+            return codec.decode(file.read())
+
+    def _write(self, path: str, data: dict):
+        write_atomic(path, codec.encode(data, self.pretty))
+
+    @property
+    def _general_data_file_path(self) -> str:
+        return os.path.join(self.directory, "generalContestInfo.json")
+
+    def contest_path(self, contest_name: str) -> str:
+        return os.path.join(self.directory, contest_name + ".json")
+
+    def all_names(self) -> list[str]:
+        return self._read(self._general_data_file_path)['allContestNames']
+
+    def load(self, contest_name: str) -> dict:
+        return codec.normalize_contest_data(self._read(self.contest_path(contest_name)))
+
+    def save(self, contest_name: str, data: dict, register_name: bool = True, events: list[dict] = ()):
+        if register_name:
+            general_data = self._read(self._general_data_file_path)
+            if contest_name not in general_data['allContestNames']:
+                general_data['allContestNames'].append(contest_name)
+                self._write(self._general_data_file_path, general_data)
+        self._write(self.contest_path(contest_name), data)
+
+    def delete(self, contest_name: str):
+        os.remove(self.contest_path(contest_name))
+        general_data = self._read(self._general_data_file_path)
+        general_data['allContestNames'].remove(contest_name)
+        self._write(self._general_data_file_path, general_data)
+
+    def signature(self, contest_name: str) -> tuple:
+        stat = os.stat(self.contest_path(contest_name))
+        return stat.st_mtime_ns, stat.st_size
+
+
+# each table is described by (key columns, value columns).
+_SQLITE_TABLES: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "contests": (("name",), ("link", "team_size_limit", "period", "team_submit_order", "next_question_id")),
+    "questions": (("contest", "id"), ("position", "correct_answer", "point_value")),
+    "teams": (("contest", "name"), ("position", "owner_id", "answers_submitted", "submit_ranking", "channel_id")),
+    "members": (("contest", "team", "member_id"), ("position",)),
+    "invitations": (("contest", "team", "member_id"), ("position",)),
+    "answers": (("contest", "team", "question_id"), ("answer",)),
+}
+
+
+# rows are kept as {table: {key: values}}, which makes it easy to find out which ones changed.
+def _data_to_rows(data: dict) -> dict[str, dict[tuple, tuple]]:
+    info = data["info"]
+    contest_name = info["name"]
+    rows: dict[str, dict[tuple, tuple]] = {table: {} for table in _SQLITE_TABLES}
+    rows["contests"][(contest_name,)] = (
+        info["link"], info["teamSizeLimit"], info["period"], info["teamSubmitOrder"], info["nextQuestionID"]
+    )
+    for position, question in enumerate(data["questions"], start=1):
+        rows["questions"][(contest_name, question["id"])] = (
+            position, question["correctAnswer"], question["pointValue"]
+        )
+    for position, team in enumerate(data["teams"], start=1):
+        team_name = team["name"]
+        rows["teams"][(contest_name, team_name)] = (
+            position, team["ownerID"], team["answersSubmitted"], team["submitRanking"], team.get("channelID")
+        )
+        for member_position, member_id in enumerate(team["memberIDs"], start=1):
+            rows["members"][(contest_name, team_name, member_id)] = (member_position,)
+        for member_position, member_id in enumerate(team["invitedMemberIDs"], start=1):
+            rows["invitations"][(contest_name, team_name, member_id)] = (member_position,)
+        for question_id, answer in team["answers"].items():
+            rows["answers"][(contest_name, team_name, int(question_id))] = (answer,)
+    return rows
+
+
+def _rows_to_data(rows: dict[str, dict[tuple, tuple]]) -> dict:
+    (contest_name,), (link, team_size_limit, period, team_submit_order, next_question_id) = next(
+        iter(rows["contests"].items()))
+    teams: dict[str, dict] = {}
+    for (_, team_name), (position, owner_id, answers_submitted, submit_ranking, channel_id) in sorted(
+            rows["teams"].items(), key=lambda row: row[1][0]):
+        teams[team_name] = {
+            "name": team_name,
+            "ownerID": owner_id,
+            "memberIDs": [],
+            "invitedMemberIDs": [],
+            "answers": {},
+            "answersSubmitted": bool(answers_submitted),
+            "submitRanking": submit_ranking,
+            "channelID": channel_id
+        }
+    for table, field in (("members", "memberIDs"), ("invitations", "invitedMemberIDs")):
+        for (_, team_name, member_id), _ in sorted(rows[table].items(), key=lambda row: row[1][0]):
+            teams[team_name][field].append(member_id)
+    for (_, team_name, question_id), (answer,) in rows["answers"].items():
+        teams[team_name]["answers"][question_id] = answer
+    return {
+        "info": {
+            "teamSizeLimit": team_size_limit,
+            "link": link,
+            "name": contest_name,
+            "period": period,
+            "teamSubmitOrder": team_submit_order,
+            "nextQuestionID": next_question_id
+        },
+        "questions": [
+            {"id": question_id, "correctAnswer": correct_answer, "pointValue": point_value}
+            for (_, question_id), (_, correct_answer, point_value) in sorted(
+                rows["questions"].items(), key=lambda row: row[1][0])
+        ],
+        "teams": list(teams.values())
+    }
+
+
+# stores every contest in a single sqlite database(in WAL mode), with one row per question, team, member,
+# invitation and answer.
+# the rows of each contest are remembered after it's loaded or saved, so that saving only writes
+# the rows that actually changed; answering a question turns into a single-row upsert.
+class SqliteContestStore(ContestStore):
+    def __init__(self, database_path: str = "data/contests.db"):
+        self.database_path = database_path
+        # the connection may be used from worker threads, but only by one of them at a time.
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection_lock = threading.Lock()
+        self._saved_rows: dict[str, dict[str, dict[tuple, tuple]]] = {}
+        with self._connection_lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            for table, (key_columns, value_columns) in _SQLITE_TABLES.items():
+                extra_columns = ", revision INTEGER NOT NULL DEFAULT 0" if table == "contests" else ""
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    f"{', '.join(key_columns + value_columns)}{extra_columns}, "
+                    f"PRIMARY KEY ({', '.join(key_columns)}))"
+                )
+                # value columns that were added later(e.g. teams.channel_id) are added to older databases.
+                existing_columns = {row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+                for column in value_columns:
+                    if column not in existing_columns:
+                        self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+    def _read_rows(self, contest_name: str) -> dict[str, dict[tuple, tuple]]:
+        rows: dict[str, dict[tuple, tuple]] = {}
+        for table, (key_columns, value_columns) in _SQLITE_TABLES.items():
+            contest_column = key_columns[0]
+            cursor = self._connection.execute(
+                f"SELECT {', '.join(key_columns + value_columns)} FROM {table} WHERE {contest_column} = ?",
+                (contest_name,)
+            )
+            rows[table] = {row[:len(key_columns)]: row[len(key_columns):] for row in cursor}
+        return rows
+
+    def all_names(self) -> list[str]:
+        with self._connection_lock:
+            return [row[0] for row in self._connection.execute("SELECT name FROM contests ORDER BY rowid")]
+
+    def load(self, contest_name: str) -> dict:
+        with self._connection_lock:
+            rows = self._read_rows(contest_name)
+        if not rows["contests"]:
+            raise FileNotFoundError(f"There is no contest named '{contest_name}' in {self.database_path}.")
+        self._saved_rows[contest_name] = rows
+        return _rows_to_data(rows)
+
+    def save(self, contest_name: str, data: dict, register_name: bool = True, events: list[dict] = ()):
+        rows = _data_to_rows(data)
+        with self._connection_lock, self._connection:
+            previous_rows = self._saved_rows.get(contest_name)
+            if previous_rows is None:
+                previous_rows = self._read_rows(contest_name)
+            for table, (key_columns, value_columns) in _SQLITE_TABLES.items():
+                columns = key_columns + value_columns
+                removed_keys = previous_rows[table].keys() - rows[table].keys()
+                self._connection.executemany(
+                    f"DELETE FROM {table} WHERE {' AND '.join(column + ' = ?' for column in key_columns)}",
+                    removed_keys
+                )
+                changed_rows = [
+                    key + values for key, values in rows[table].items()
+                    if previous_rows[table].get(key) != values
+                ]
+                self._connection.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET "
+                    f"{', '.join(column + ' = excluded.' + column for column in value_columns)}",
+                    changed_rows
+                )
+            self._connection.execute("UPDATE contests SET revision = revision + 1 WHERE name = ?", (contest_name,))
+        self._saved_rows[contest_name] = rows
+
+    def delete(self, contest_name: str):
+        with self._connection_lock, self._connection:
+            for table, (key_columns, _) in _SQLITE_TABLES.items():
+                self._connection.execute(f"DELETE FROM {table} WHERE {key_columns[0]} = ?", (contest_name,))
+        self._saved_rows.pop(contest_name, None)
+
+    def signature(self, contest_name: str) -> tuple:
+        with self._connection_lock:
+            row = self._connection.execute(
+                "SELECT revision FROM contests WHERE name = ?", (contest_name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"There is no contest named '{contest_name}' in {self.database_path}.")
+        return tuple(row)
@@ -47,3 +47,25 @@ class OwnerLeaveTeamException(Exception):
         super().__init__(
             "The owner cannot leave the team. They must either delete it, "
             "or transfer ownership using /transfer_ownership to another team member.")
+
+
+# an uploaded input(an answer sheet, a roster, etc.) with problems; they are all collected before raising,
+# so that they can be fixed at once.
+class InputProblemsException(Exception):
+    summary = "The input could not be read"
+
+    def __init__(self, *problems: str):
+        self.problems = problems
+        super().__init__(self.summary + ": " + "; ".join(problems))
+
+
+class AnswerSheetFormatException(InputProblemsException):
+    summary = "The answer sheet could not be read"
+
+
+class TeamImportException(InputProblemsException):
+    summary = "The teams could not be imported"
+
+
+class AnswerKeyFormatException(InputProblemsException):
+    summary = "The answer key could not be read"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from question import ANSWER_TOLERANCE
+
+if TYPE_CHECKING:
+    from contest import Contest
+    from team import Team
+
+
+# the result of grading every team of a contest at once.
+# rows correspond to contest.teams, and columns correspond to contest.questions.
+class GradingResult:
+    def __init__(self, teams: list[Team], correct: np.ndarray, raw_points: np.ndarray, submitted: np.ndarray):
+        self.teams = teams
+        # correct[i, j] is True if team i answered question j + 1 correctly.
+        self.correct = correct
+        # the points of each team, whether or not it has submitted its answers.
+        self.raw_points = raw_points
+        # the points of each team as shown in the rankings; teams that haven't submitted get 0.
+        self.total_points = np.where(submitted, raw_points, 0)
+
+    @property
+    def correct_count_per_question(self) -> np.ndarray:
+        return self.correct.sum(axis=0)
+
+    def raw_points_of_teams(self) -> dict[Team, float]:
+        return dict(zip(self.teams, self.raw_points.tolist()))
+
+
+# packs every team's answers into a teams x questions matrix(with NaN for unanswered questions),
+# then grades the whole contest in a single vectorized comparison against the answer key.
+def grade_contest(contest: Contest) -> GradingResult:
+    teams = list(contest.teams)
+    # answers are keyed by question id, so they are first packed into a teams x question ids matrix,
+    # and then the columns of the current questions are picked out in order.
+    question_columns = np.array([question.id - 1 for question in contest.questions], dtype=np.int64)
+    id_count = int(question_columns.max()) + 1 if len(question_columns) else 0
+    answers_by_id = np.full((len(teams), id_count), np.nan)
+    # the answers of each team are already stored as an array of doubles with NaN for unanswered questions
+    # (see PackedAnswers), so each row is copied over straight from its buffer.
+    for row, team in enumerate(teams):
+        values = team.answers.values_array
+        if values:
+            # answers to questions that no longer exist are ignored.
+            row_values = np.frombuffer(values, dtype=float)[:id_count]
+            answers_by_id[row, :len(row_values)] = row_values
+    answers = answers_by_id[:, question_columns]
+    answer_key = np.array([question.correct_answer for question in contest.questions], dtype=float)
+    # the dtype is left to numpy, so that integer point values give integer totals.
+    point_values = np.array([question.point_value for question in contest.questions])
+    # comparisons against NaN are always False, so unanswered questions are never correct.
+    with np.errstate(invalid='ignore'):
+        correct = np.abs(answers - answer_key) < ANSWER_TOLERANCE
+    raw_points = correct @ point_values
+    submitted = np.array([team.answers_submitted for team in teams], dtype=bool)
+    return GradingResult(teams, correct, raw_points, submitted)
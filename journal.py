@@ -0,0 +1,159 @@
+import glob
+import os
+
+import codec
+from conteststore import JsonContestStore
+
+
+# replays domain events(see Contest.record_event) onto a contest in dict form, in place.
+def apply_events(document: dict, events: list[dict]):
+    teams_by_name = {team["name"]: team for team in document["teams"]}
+    for event in events:
+        team = teams_by_name.get(event.get("team")) if isinstance(event.get("team"), str) else None
+        match event["type"]:
+            case "PeriodChanged":
+                document["info"]["period"] = event["period"]
+            case "TeamRegistered":
+                team = dict(event["team"])
+                document["teams"].append(team)
+                teams_by_name[team["name"]] = team
+            case "TeamRemoved":
+                del teams_by_name[team["name"]]
+                document["teams"] = [other_team for other_team in document["teams"] if other_team is not team]
+            case "TeamRenamed":
+                del teams_by_name[team["name"]]
+                team["name"] = event["newName"]
+                teams_by_name[team["name"]] = team
+            case "MemberInvited":
+                team["invitedMemberIDs"].append(event["memberID"])
+            case "MemberUninvited":
+                team["invitedMemberIDs"].remove(event["memberID"])
+            case "MemberJoined":
+                team["memberIDs"].append(event["memberID"])
+            case "MemberLeft":
+                team["memberIDs"].remove(event["memberID"])
+            case "OwnershipTransferred":
+                team["memberIDs"].append(team["ownerID"])
+                team["memberIDs"].remove(event["newOwnerID"])
+                team["ownerID"] = event["newOwnerID"]
+            case "AnswerRecorded":
+                team["answers"][event["question"]] = event["answer"]
+            case "AnswersSubmitted":
+                team["answersSubmitted"] = True
+                team["submitRanking"] = event["submitRanking"]
+                document["info"]["teamSubmitOrder"] = event["submitRanking"] + 1
+            case "ChannelChanged":
+                team["channelID"] = event["channelID"]
+            case "AnswersUnsubmitted":
+                team["answersSubmitted"] = False
+                team["submitRanking"] = 0
+            case _:
+                raise ValueError("Unknown contest event type: " + event["type"])
+
+
+# the parts of a contest that events don't describe(which are small, and rarely change).
+# if they change, the contest has to be saved as a whole again.
+def _unjournaled_state(document: dict) -> tuple[dict, list[dict]]:
+    info = {key: value for key, value in document["info"].items() if key not in ("period", "teamSubmitOrder")}
+    return info, [dict(question) for question in document["questions"]]
+
+
+# keeps the usual json file of each contest as a snapshot, plus an append-only journal of the events
+# that happened since then(data/<name>.journal.jsonl), so that saving a contest usually only appends
+# a few lines instead of rewriting the whole file.
+# loading a contest reads the snapshot and replays the journal on top of it.
+# once the journal gets long, a new snapshot is written and the journal is archived under
+# data/<name>.journal.<last event number>.jsonl, so the full history of the contest is kept.
+class JournaledContestStore(JsonContestStore):
+    def __init__(self, directory: str = "data", pretty: bool = False, compact_after: int = 1000):
+        super().__init__(directory, pretty)
+        self.compact_after = compact_after
+        # the number of the last event written for each contest.
+        self._last_sequence: dict[str, int] = {}
+        # the number of events in the current journal of each contest.
+        self._journal_lengths: dict[str, int] = {}
+        self._last_unjournaled_state: dict[str, tuple[dict, list[dict]]] = {}
+
+    def journal_path(self, contest_name: str) -> str:
+        return os.path.join(self.directory, contest_name + ".journal.jsonl")
+
+    def load(self, contest_name: str) -> dict:
+        document = super().load(contest_name)
+        snapshot_sequence = document.pop("journalSequence", 0)
+        events = self._read_journal(contest_name)
+        # events that made it into the snapshot are skipped; this only happens if the bot stopped
+        # between writing a snapshot and archiving the journal.
+        tail = [event for event in events if event["seq"] > snapshot_sequence]
+        apply_events(document, tail)
+        self._last_sequence[contest_name] = max([snapshot_sequence] + [event["seq"] for event in events])
+        self._journal_lengths[contest_name] = len(tail)
+        self._last_unjournaled_state[contest_name] = _unjournaled_state(document)
+        return document
+
+    # if the bot stopped while appending to the journal, its last line may have only been written partly.
+    # that save never finished(so its events are lost either way), and the line is cut off the journal;
+    # otherwise the contest couldn't be loaded anymore, and the next append would continue the broken line.
+    def _read_journal(self, contest_name: str) -> list[dict]:
+        path = self.journal_path(contest_name)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as file:
+            lines = [line for line in file if line.strip()]
+        if not lines:
+            return []
+        try:
+            last_event = codec.decode(lines[-1])
+        except ValueError:
+            last_event = None
+        if last_event is None or not lines[-1].endswith(b"\n"):
+            with open(path, 'r+b') as file:
+                file.seek(0, os.SEEK_END)
+                if last_event is None:
+                    file.truncate(file.tell() - len(lines.pop()))
+                else:
+                    file.write(b"\n")
+                file.flush()
+                os.fsync(file.fileno())
+        return [codec.decode(line) for line in lines]
+
+    def save(self, contest_name: str, data: dict, register_name: bool = True, events: list[dict] = ()):
+        if events:
+            self._append(contest_name, events)
+        if (self._last_unjournaled_state.get(contest_name) != _unjournaled_state(data)
+                or self._journal_lengths[contest_name] >= self.compact_after):
+            self._write_snapshot(contest_name, data, register_name)
+
+    def _append(self, contest_name: str, events: list[dict]):
+        lines = []
+        sequence = self._last_sequence.get(contest_name, 0)
+        for event in events:
+            sequence += 1
+            lines.append(codec.encode({"seq": sequence, **event}) + b"\n")
+        with open(self.journal_path(contest_name), 'ab') as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        self._last_sequence[contest_name] = sequence
+        self._journal_lengths[contest_name] = self._journal_lengths.get(contest_name, 0) + len(events)
+
+    def _write_snapshot(self, contest_name: str, data: dict, register_name: bool):
+        sequence = self._last_sequence.get(contest_name, 0)
+        super().save(contest_name, {**data, "journalSequence": sequence}, register_name)
+        journal_path = self.journal_path(contest_name)
+        if os.path.exists(journal_path):
+            os.replace(journal_path, os.path.join(self.directory, f"{contest_name}.journal.{sequence}.jsonl"))
+        self._journal_lengths[contest_name] = 0
+        self._last_unjournaled_state[contest_name] = _unjournaled_state(data)
+
+    def delete(self, contest_name: str):
+        super().delete(contest_name)
+        for path in glob.glob(os.path.join(glob.escape(self.directory), glob.escape(contest_name) + ".journal.*")):
+            os.remove(path)
+        self._last_sequence.pop(contest_name, None)
+        self._journal_lengths.pop(contest_name, None)
+        self._last_unjournaled_state.pop(contest_name, None)
+
+    def signature(self, contest_name: str) -> tuple:
+        journal_path = self.journal_path(contest_name)
+        journal_size = os.stat(journal_path).st_size if os.path.exists(journal_path) else -1
+        return super().signature(contest_name) + (journal_size,)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+
+# measures how long the event loop gets blocked for, by repeatedly sleeping for a short interval
+# and checking how late it wakes up. while the loop is blocked, discord heartbeats and every
+# other command have to wait, so this should stay close to 0.
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, stall_threshold: float = 0.25, window: int = 600):
+        self.interval = interval
+        # lags at least this long(in seconds) are counted as stalls and logged.
+        self.stall_threshold = stall_threshold
+        self.samples = 0
+        # the sum of every lag measured so far; roughly the total time the loop was blocked for.
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        # the last few lags(a minute's worth by default).
+        self._recent_lags: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+
+    # can be called more than once(e.g. from on_ready, which runs again after reconnecting).
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.perf_counter() - start - self.interval))
+
+    def record(self, lag: float):
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self._recent_lags.append(lag)
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            logging.warning(f"The event loop was blocked for {lag * 1000:.0f} ms.")
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples else 0.0
+
+    @property
+    def recent_max_lag(self) -> float:
+        return max(self._recent_lags, default=0.0)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+MEMBER_NOT_FOUND = "(Member not found)"
+
+
+# the display names of guild members, for commands that list many members at once(e.g. /show_teams).
+# guild.get_member only knows the members in discord.py's cache; instead of giving up on the others, every
+# member missing from a listing is requested at once, in chunks of chunk_size(the most discord allows).
+# names are cached for ttl seconds, and kept up to date by remember/forget(called from the member events);
+# members that couldn't be found are cached as well, so that they aren't requested again for every listing.
+class MemberNameResolver:
+    def __init__(self, ttl: float = 600.0, chunk_size: int = 100, max_cached_names: int = 20000):
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.max_cached_names = max_cached_names
+        # maps (guild id, member id) to (display name or None if not found, when it expires).
+        self._names: OrderedDict[tuple[int, int], tuple[str | None, float]] = OrderedDict()
+
+    def remember(self, member: discord.Member):
+        self._store(member.guild.id, member.id, member.display_name)
+
+    def forget(self, guild_id: int, member_id: int):
+        self._names.pop((guild_id, member_id), None)
+
+    def _store(self, guild_id: int, member_id: int, name: str | None):
+        key = (guild_id, member_id)
+        self._names[key] = (name, time.monotonic() + self.ttl)
+        self._names.move_to_end(key)
+        if len(self._names) > self.max_cached_names:
+            self._names.popitem(last=False)
+
+    # returns (True, name) if the name of the member is known, or (False, None) if it has to be requested.
+    def _known_name(self, guild: discord.Guild, member_id: int) -> tuple[bool, str | None]:
+        cached = self._names.get((guild.id, member_id))
+        if cached is not None and cached[1] > time.monotonic():
+            return True, cached[0]
+        member = guild.get_member(member_id)
+        if member is not None:
+            self.remember(member)
+            return True, member.display_name
+        return False, None
+
+    # whether resolve would have to wait on discord(so that the command can defer first).
+    def needs_fetch(self, guild: discord.Guild, member_ids) -> bool:
+        return any(not self._known_name(guild, member_id)[0] for member_id in member_ids)
+
+    # maps every member id to its display name, or MEMBER_NOT_FOUND if the member isn't in the guild.
+    async def resolve(self, guild: discord.Guild, member_ids) -> dict[int, str]:
+        names: dict[int, str] = {}
+        missing_ids: list[int] = []
+        for member_id in dict.fromkeys(member_ids):
+            known, name = self._known_name(guild, member_id)
+            if known:
+                names[member_id] = name or MEMBER_NOT_FOUND
+            else:
+                missing_ids.append(member_id)
+        for start in range(0, len(missing_ids), self.chunk_size):
+            chunk = missing_ids[start:start + self.chunk_size]
+            try:
+                members = await guild.query_members(user_ids=chunk, limit=len(chunk))
+                failed = False
+            except (asyncio.TimeoutError, discord.ClientException) as error:
+                # the names are only informative, so the listing goes on without them(and they aren't cached).
+                logging.warning(f"Could not request {len(chunk)} member(s): {error}")
+                members, failed = [], True
+            found = {member.id: member for member in members}
+            for member_id in chunk:
+                member = found.get(member_id)
+                if member is not None:
+                    self.remember(member)
+                    names[member_id] = member.display_name
+                else:
+                    if not failed:
+                        self._store(guild.id, member_id, None)
+                    names[member_id] = MEMBER_NOT_FOUND
+        return names
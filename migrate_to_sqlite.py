@@ -0,0 +1,21 @@
+# one-shot tool that copies every contest from the json files in data/ into a sqlite database,
+# for use with SqliteContestStore(set contest_store=sqlite in secrets.env afterwards).
+# usage: python migrate_to_sqlite.py [database path]
+import sys
+
+from contest import Contest
+from conteststore import ContestStore, JsonContestStore, SqliteContestStore
+
+
+def migrate(source: ContestStore, destination: ContestStore) -> list[str]:
+    contest_names = source.all_names()
+    for contest_name in contest_names:
+        # going through Contest upgrades files written by older versions of the bot(e.g. without question ids).
+        destination.save(contest_name, Contest.from_data(source.load(contest_name)).data)
+    return contest_names
+
+
+if __name__ == "__main__":
+    database_path = sys.argv[1] if len(sys.argv) > 1 else "data/contests.db"
+    migrated_names = migrate(JsonContestStore(), SqliteContestStore(database_path))
+    print(f"Migrated {len(migrated_names)} contest(s) into {database_path}: {migrated_names}")
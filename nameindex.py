@@ -0,0 +1,80 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# a sorted index of names, used for autocompletion.
+# names are compared casefolded, so that searches don't depend on capitalization.
+# besides the sorted list(for prefix searches), every name is also indexed by its trigrams
+# (3 character substrings), so that names containing the query, or close to it, can be found
+# without scanning every name.
+class NameIndex:
+    def __init__(self, names: list[str] | None = None):
+        self._entries: list[tuple[str, str]] = []
+        self._names_by_trigram: dict[str, set[str]] = {}
+        for name in names or []:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        entry = (name.casefold(), name)
+        position = bisect_left(self._entries, entry)
+        return position < len(self._entries) and self._entries[position] == entry
+
+    def add(self, name: str):
+        if name in self:
+            return
+        insort(self._entries, (name.casefold(), name))
+        for trigram in _trigrams(name.casefold()):
+            self._names_by_trigram.setdefault(trigram, set()).add(name)
+
+    def remove(self, name: str):
+        entry = (name.casefold(), name)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+            for trigram in _trigrams(entry[0]):
+                names = self._names_by_trigram[trigram]
+                names.discard(name)
+                if not names:
+                    del self._names_by_trigram[trigram]
+
+    # returns up to limit names that start with current(found with a binary search),
+    # followed by the names that contain it, then the names that share most of its trigrams
+    # (which catches small typos), if there's room left.
+    def search(self, current: str, limit: int) -> list[str]:
+        query = current.casefold()
+        results: list[str] = []
+        position = bisect_left(self._entries, (query,))
+        while (position < len(self._entries) and len(results) < limit
+               and self._entries[position][0].startswith(query)):
+            results.append(self._entries[position][1])
+            position += 1
+        if len(results) < limit and query:
+            prefix_matches = set(results)
+            results += [
+                name for name in self._ranked_matches(query)
+                if name not in prefix_matches
+            ][:limit - len(results)]
+        return results
+
+    def _ranked_matches(self, query: str) -> list[str]:
+        query_trigrams = _trigrams(query)
+        # queries that are too short to have trigrams are matched by substring instead.
+        if not query_trigrams:
+            return [name for folded_name, name in self._entries if query in folded_name]
+        shared_trigrams: Counter[str] = Counter()
+        for trigram in query_trigrams:
+            shared_trigrams.update(self._names_by_trigram.get(trigram, ()))
+        minimum_shared = (len(query_trigrams) + 1) // 2
+        candidates = [name for name, shared in shared_trigrams.items() if shared >= minimum_shared]
+        return sorted(candidates, key=lambda name: (
+            query not in name.casefold(),
+            -shared_trigrams[name],
+            name.casefold()
+        ))
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+
+import discord
+
+import codec
+from conteststore import write_atomic
+
+
+# a direct message waiting to be sent to a member.
+class Notification:
+    def __init__(self, member_id: int, content: str, attempts: int = 0, next_attempt: float = 0.0,
+                 last_error: str | None = None):
+        self.member_id = member_id
+        self.content = content
+        self.attempts = attempts
+        # the unix timestamp before which it shouldn't be retried.
+        self.next_attempt = next_attempt
+        self.last_error = last_error
+
+    @property
+    def data(self) -> dict:
+        return {
+            "memberID": self.member_id,
+            "content": self.content,
+            "attempts": self.attempts,
+            "nextAttempt": self.next_attempt,
+            "lastError": self.last_error
+        }
+
+    @staticmethod
+    def from_data(data: dict):
+        return Notification(
+            data["memberID"], data["content"], data.get("attempts", 0), data.get("nextAttempt", 0.0),
+            data.get("lastError"))
+
+
+# sends direct messages in the background, so that commands never wait on(or fail because of) a DM.
+# commands enqueue their notifications and return right away; the outbox is kept in a file, so notifications
+# that haven't been sent yet survive restarts. at most max_concurrency DMs are sent at the same time, and the
+# DM channel of each member is cached, so that notifying the same member again doesn't need another api call.
+# a DM that fails is retried with exponential backoff; it's moved to the dead letters once it has failed
+# max_attempts times, or right away if it can never succeed(e.g. the member doesn't accept DMs).
+class NotificationOutbox:
+    def __init__(self, client: discord.Client, path: str = "data/outbox.json", max_concurrency: int = 4,
+                 max_attempts: int = 5, base_backoff: float = 2.0, dm_channel_cache_size: int = 1024,
+                 dead_letter_limit: int = 500):
+        self.client = client
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.dm_channel_cache_size = dm_channel_cache_size
+        # only the most recent dead letters are kept.
+        self.dead_letter_limit = dead_letter_limit
+        self.pending: list[Notification] = []
+        self.dead_letters: list[Notification] = []
+        self.sent = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = codec.decode(file.read())
+            self.pending = [Notification.from_data(entry) for entry in data["pending"]]
+            self.dead_letters = [Notification.from_data(entry) for entry in data["deadLetters"]]
+        self._dm_channels: OrderedDict[int, discord.DMChannel] = OrderedDict()
+        self._in_flight: set[Notification] = set()
+        self._deliveries: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._save_lock = asyncio.Lock()
+        # set whenever there may be something new to send.
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    # can be called more than once(e.g. from on_ready, which runs again after reconnecting).
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # queues a DM to every member(e.g. everyone invited to a team), and returns once they're written to the outbox.
+    async def enqueue(self, member_ids, content: str):
+        notifications = [Notification(member_id, content) for member_id in member_ids]
+        if not notifications:
+            return
+        self.pending += notifications
+        await self._save()
+        self._wakeup.set()
+
+    async def _save(self):
+        async with self._save_lock:
+            raw = codec.encode({
+                "pending": [notification.data for notification in self.pending],
+                "deadLetters": [notification.data for notification in self.dead_letters]
+            })
+            await asyncio.to_thread(write_atomic, self.path, raw)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            waiting = [notification for notification in self.pending if notification not in self._in_flight]
+            for notification in waiting:
+                if notification.next_attempt <= now:
+                    self._in_flight.add(notification)
+                    task = asyncio.get_running_loop().create_task(self._deliver(notification))
+                    # the loop only keeps weak references to tasks, so they're kept here until they finish.
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._deliveries.discard)
+            retry_times = [notification.next_attempt for notification in waiting if notification.next_attempt > now]
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(retry_times) - now if retry_times else None)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dm_channel(self, member_id: int) -> discord.DMChannel:
+        if member_id in self._dm_channels:
+            self._dm_channels.move_to_end(member_id)
+            return self._dm_channels[member_id]
+        user = self.client.get_user(member_id) or await self.client.fetch_user(member_id)
+        channel = await user.create_dm()
+        self._dm_channels[member_id] = channel
+        if len(self._dm_channels) > self.dm_channel_cache_size:
+            self._dm_channels.popitem(last=False)
+        return channel
+
+    async def _deliver(self, notification: Notification):
+        try:
+            async with self._semaphore:
+                try:
+                    channel = await self._dm_channel(notification.member_id)
+                    await channel.send(notification.content)
+                except (discord.Forbidden, discord.NotFound) as error:
+                    # the member doesn't accept DMs from the bot, or doesn't exist anymore; retrying won't help.
+                    self._fail(notification, error, retry=False)
+                except Exception as error:
+                    # the cached channel might be the problem, so it's fetched again for the retry.
+                    self._dm_channels.pop(notification.member_id, None)
+                    self._fail(notification, error, retry=True)
+                else:
+                    self.pending.remove(notification)
+                    self.sent += 1
+            await self._save()
+        finally:
+            self._in_flight.discard(notification)
+            self._wakeup.set()
+
+    def _fail(self, notification: Notification, error: Exception, retry: bool):
+        notification.attempts += 1
+        notification.last_error = str(error)
+        if retry and notification.attempts < self.max_attempts:
+            # jitter keeps the retries of many DMs from all happening at the same moment.
+            delay = self.base_backoff * 2 ** (notification.attempts - 1) * random.uniform(0.5, 1.5)
+            notification.next_attempt = time.time() + delay
+            return
+        logging.warning(f"Gave up on a DM to {notification.member_id}: {error}")
+        self.pending.remove(notification)
+        self.dead_letters = (self.dead_letters + [notification])[-self.dead_letter_limit:]
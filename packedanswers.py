@@ -0,0 +1,79 @@
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+
+_UNANSWERED = float('nan')
+
+
+# the answers of a team, keyed by question id(see Question.id).
+# instead of a dict of boxed floats, answers are stored in a single array of doubles(indexed by question id - 1),
+# with an int used as a bitmap of which questions were answered.
+# unanswered slots hold NaN, so the array can be handed to numpy as is(see grading.py).
+class PackedAnswers(MutableMapping[int, float]):
+    __slots__ = ("_values", "_present")
+
+    def __init__(self, answers: Mapping[int, float] | Iterable[tuple[int, float]] = ()):
+        self._values = array('d')
+        self._present = 0
+        self.update(answers)
+
+    @staticmethod
+    def _slot(question_id: int) -> int:
+        if not isinstance(question_id, int) or question_id < 1:
+            raise KeyError(question_id)
+        return question_id - 1
+
+    def __getitem__(self, question_id: int) -> float:
+        slot = self._slot(question_id)
+        if not self._present >> slot & 1:
+            raise KeyError(question_id)
+        return self._values[slot]
+
+    def __setitem__(self, question_id: int, answer: float):
+        slot = self._slot(question_id)
+        if slot >= len(self._values):
+            self._values.extend([_UNANSWERED] * (slot + 1 - len(self._values)))
+        self._values[slot] = answer
+        self._present |= 1 << slot
+
+    def __delitem__(self, question_id: int):
+        slot = self._slot(question_id)
+        if not self._present >> slot & 1:
+            raise KeyError(question_id)
+        self._values[slot] = _UNANSWERED
+        self._present &= ~(1 << slot)
+
+    def __contains__(self, question_id) -> bool:
+        if not isinstance(question_id, int) or question_id < 1:
+            return False
+        return bool(self._present >> question_id - 1 & 1)
+
+    # yields the ids of the answered questions in increasing order, by peeling off the lowest set bit each time.
+    def __iter__(self) -> Iterator[int]:
+        present = self._present
+        while present:
+            lowest_bit = present & -present
+            yield lowest_bit.bit_length()
+            present ^= lowest_bit
+
+    def __len__(self) -> int:
+        return self._present.bit_count()
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    # the answers as a plain dict. going through the generic Mapping methods would look up every key on its own,
+    # which adds up when every team is turned into a dict(i.e. on every write), so the array is read directly.
+    def to_dict(self) -> dict[int, float]:
+        values, present = self._values, self._present
+        if present == (1 << len(values)) - 1:
+            # every question was answered, which is the usual case.
+            return dict(zip(range(1, len(values) + 1), values))
+        return {slot + 1: answer for slot, answer in enumerate(values) if present >> slot & 1}
+
+    def items(self):
+        return self.to_dict().items()
+
+    # the raw answer array; index i holds the answer to the question with id i + 1, or NaN if it wasn't answered.
+    @property
+    def values_array(self) -> array:
+        return self._values
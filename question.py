@@ -6,27 +6,61 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from contest import Contest
 
+# answers within this distance of the correct answer are counted as correct.
+ANSWER_TOLERANCE = 1e-8
+
 
 class Question:
-    def __init__(self, contest_instance: Contest, correct_answer: float, point_value: int):
+    __slots__ = ("contest_instance", "id", "_correct_answer", "_point_value")
+
+    # question_id is left as None for new questions; the contest gives them an id when they're added.
+    def __init__(self, contest_instance: Contest, correct_answer: float, point_value: int,
+                 question_id: int | None = None):
         self.contest_instance = contest_instance
-        self.correct_answer = correct_answer
-        self.point_value = point_value
+        # unlike the question number, the id of a question never changes, even when questions before it
+        # are added or removed. team answers are keyed by it.
+        self.id = question_id
+        self._correct_answer = correct_answer
+        self._point_value = point_value
+
+    # changing the answer or point value of a question changes the score of every team that answered it,
+    # so the contest's scoreboard has to be told about it.
+    @property
+    def correct_answer(self) -> float:
+        return self._correct_answer
+
+    @correct_answer.setter
+    def correct_answer(self, value: float):
+        self.contest_instance.scoreboard.remove_question(self)
+        self._correct_answer = value
+        self.contest_instance.scoreboard.add_question(self)
+
+    @property
+    def point_value(self) -> int:
+        return self._point_value
+
+    @point_value.setter
+    def point_value(self, value: int):
+        self.contest_instance.scoreboard.remove_question(self)
+        self._point_value = value
+        self.contest_instance.scoreboard.add_question(self)
 
     @property
     def number(self) -> int:
-        return self.contest_instance.questions.index(self) + 1
+        return self.contest_instance.number_of_question(self)
 
     # corrects for floating point error.
-    def verify(self, answer: float): return abs(answer - self.correct_answer) < 1e-8
+    def verify(self, answer: float): return abs(answer - self.correct_answer) < ANSWER_TOLERANCE
 
     @property
     def data(self) -> dict:
         return {
+            "id": self.id,
             "correctAnswer": self.correct_answer,
             "pointValue": self.point_value
         }
 
+    # files from before questions had ids keyed answers by question number, so the number is used as the id.
     @staticmethod
-    def from_data(contest_instance, data: dict):
-        return Question(contest_instance, data["correctAnswer"], data["pointValue"])
+    def from_data(contest_instance, data: dict, question_number: int):
+        return Question(contest_instance, data["correctAnswer"], data["pointValue"], data.get("id", question_number))
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import time
+
+import discord
+
+import codec
+from bulkexecutor import BulkExecutor
+from contestperiod import ContestPeriod
+from contestrepository import ContestRepository
+from conteststore import write_atomic
+from teamchannels import close_team_channels, delete_orphaned_channels, open_team_channels, reveal_team_channels
+
+
+# the start(and optionally the end) of a contest, as unix timestamps.
+# stage is how far along the contest is: "scheduled", then "staged"(the team channels were created, but are
+# still hidden), then "started", and finally "ended", at which point it's removed from the schedule.
+class ScheduledContest:
+    def __init__(self, contest_name: str, start_time: float, end_time: float | None, guild_id: int,
+                 category_id: int, stage: str = "scheduled", staged_channel_ids: list[int] | None = None):
+        self.contest_name = contest_name
+        self.start_time = start_time
+        self.end_time = end_time
+        self.guild_id = guild_id
+        self.category_id = category_id
+        self.stage = stage
+        # the channels created ahead of time; kept so that the ones of teams that unregister before the
+        # contest starts can be deleted(once a team is gone, nothing else knows about its channel).
+        self.staged_channel_ids = staged_channel_ids or []
+
+    @property
+    def data(self) -> dict:
+        return {
+            "contestName": self.contest_name,
+            "startTime": self.start_time,
+            "endTime": self.end_time,
+            "guildID": self.guild_id,
+            "categoryID": self.category_id,
+            "stage": self.stage,
+            "stagedChannelIDs": self.staged_channel_ids
+        }
+
+    @staticmethod
+    def from_data(data: dict):
+        return ScheduledContest(
+            data["contestName"], data["startTime"], data.get("endTime"),
+            data["guildID"], data["categoryID"], data.get("stage", "scheduled"), data.get("stagedChannelIDs"))
+
+
+# starts and ends contests at the times they were scheduled for.
+# opening a contest by hand means creating every team channel at the moment the round opens, while everyone is
+# waiting; instead, the channels are created(hidden) during the last staging_lead seconds of signup, so that
+# at the start time only the period has to be changed and the channels shown.
+# the schedule is kept in a file, so it survives restarts; anything that became due while the bot was offline
+# is done as soon as it's back. a step that fails is retried every poll_interval seconds, which is safe since
+# every step of teamchannels.py picks up where it left off.
+class ContestScheduler:
+    def __init__(self, client: discord.Client, contests: ContestRepository, executor: BulkExecutor,
+                 path: str = "data/schedule.json", staging_lead: float = 300.0, poll_interval: float = 30.0):
+        self.client = client
+        self.contests = contests
+        self.executor = executor
+        self.path = path
+        self.staging_lead = staging_lead
+        self.poll_interval = poll_interval
+        self.entries: dict[str, ScheduledContest] = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                for entry_data in codec.decode(file.read()):
+                    entry = ScheduledContest.from_data(entry_data)
+                    self.entries[entry.contest_name] = entry
+        self._task: asyncio.Task | None = None
+        # set whenever the schedule changes, so that the scheduler doesn't sleep past a new entry.
+        self._changed = asyncio.Event()
+
+    # can be called more than once(e.g. from on_ready, which runs again after reconnecting).
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def schedule(self, entry: ScheduledContest):
+        self.entries[entry.contest_name] = entry
+        await self._save()
+        self._changed.set()
+
+    # returns False if the contest wasn't scheduled.
+    async def unschedule(self, contest_name: str) -> bool:
+        if self.entries.pop(contest_name, None) is None:
+            return False
+        await self._save()
+        self._changed.set()
+        return True
+
+    # keeps the contest's schedule after it's renamed.
+    async def rename(self, contest_name: str, new_name: str):
+        entry = self.entries.pop(contest_name, None)
+        if entry is not None:
+            entry.contest_name = new_name
+            await self.schedule(entry)
+
+    async def _save(self):
+        raw = codec.encode([entry.data for entry in self.entries.values()])
+        await asyncio.to_thread(write_atomic, self.path, raw)
+
+    # when the next step of entry is due, or None if it has nothing left to do.
+    def _next_due_time(self, entry: ScheduledContest) -> float | None:
+        match entry.stage:
+            case "scheduled":
+                return entry.start_time - self.staging_lead
+            case "staged":
+                return entry.start_time
+            case "started":
+                return entry.end_time
+        return None
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            for entry in list(self.entries.values()):
+                try:
+                    await self._advance(entry)
+                except Exception:
+                    logging.exception(f"The scheduled {entry.stage} step of {entry.contest_name} failed.")
+            due_times = [due for entry in self.entries.values() if (due := self._next_due_time(entry)) is not None]
+            delay = min([self.poll_interval, *(due - time.time() for due in due_times)])
+            try:
+                await asyncio.wait_for(self._changed.wait(), max(delay, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+    # does every step of entry that is due, saving the schedule after each one.
+    async def _advance(self, entry: ScheduledContest):
+        while (due := self._next_due_time(entry)) is not None and time.time() >= due:
+            if self.entries.get(entry.contest_name) is not entry:
+                # unscheduled(or scheduled again) in the meantime.
+                return
+            guild = self.client.get_guild(entry.guild_id)
+            if guild is None:
+                raise ValueError(f"The guild {entry.guild_id} was not found.")
+            match entry.stage:
+                case "scheduled":
+                    await self._stage(entry, guild)
+                case "staged":
+                    await self._open(entry, guild)
+                case "started":
+                    await self._close(entry, guild)
+            await self._save()
+
+    def _category(self, entry: ScheduledContest, guild: discord.Guild) -> discord.CategoryChannel:
+        category = guild.get_channel(entry.category_id)
+        if not isinstance(category, discord.CategoryChannel):
+            raise ValueError(f"The category {entry.category_id} was not found.")
+        return category
+
+    # staging is only a head start: channels that couldn't be created here are created when the contest opens,
+    # so failures are logged rather than retried(which could otherwise keep the contest from opening on time).
+    async def _stage(self, entry: ScheduledContest, guild: discord.Guild):
+        report = await open_team_channels(
+            self.contests, entry.contest_name, guild, self._category(entry, guild), self.executor, visible=False)
+        if report.result.failures:
+            logging.warning(f"{len(report.result.failures)} channel(s) of {entry.contest_name} could not be staged.")
+        contest = await self.contests.get(entry.contest_name)
+        entry.staged_channel_ids = [team.channel_id for team in contest.teams if team.channel_id is not None]
+        entry.stage = "staged"
+
+    async def _open(self, entry: ScheduledContest, guild: discord.Guild):
+        async with self.contests.unit_of_work(entry.contest_name) as contest:
+            if contest.period in (ContestPeriod.preSignup, ContestPeriod.signup):
+                contest.period = ContestPeriod.competition
+            ended = contest.period == ContestPeriod.postCompetition
+        if ended:
+            # the contest was ended by hand before it was opened, so its channels are only cleaned up.
+            await self._close(entry, guild)
+            return
+        await self.contests.flush(entry.contest_name)
+        # teams registered since the channels were staged still need theirs; this is usually only a few.
+        open_report = await open_team_channels(
+            self.contests, entry.contest_name, guild, self._category(entry, guild), self.executor, visible=False)
+        reveal_report = await reveal_team_channels(self.contests, entry.contest_name, guild, self.executor)
+        entry.staged_channel_ids = await delete_orphaned_channels(
+            self.contests, entry.contest_name, guild, entry.staged_channel_ids, self.executor)
+        failures = len(open_report.result.failures) + len(reveal_report.result.failures)
+        if failures:
+            raise RuntimeError(f"{failures} channel(s) or role(s) could not be set up.")
+        entry.stage = "started"
+
+    async def _close(self, entry: ScheduledContest, guild: discord.Guild):
+        async with self.contests.unit_of_work(entry.contest_name) as contest:
+            contest.period = ContestPeriod.postCompetition
+        await self.contests.flush(entry.contest_name)
+        report = await close_team_channels(self.contests, entry.contest_name, guild, self.executor)
+        entry.staged_channel_ids = await delete_orphaned_channels(
+            self.contests, entry.contest_name, guild, entry.staged_channel_ids, self.executor)
+        if report.result.failures or entry.staged_channel_ids:
+            failures = len(report.result.failures) + len(entry.staged_channel_ids)
+            raise RuntimeError(f"{failures} channel(s) could not be deleted.")
+        entry.stage = "ended"
+        del self.entries[entry.contest_name]
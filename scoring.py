@@ -0,0 +1,156 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from itertools import count
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from contest import Contest
+    from grading import GradingResult
+    from question import Question
+    from team import Team
+
+
+# keeps the teams of a contest sorted by their rank, so that the rankings don't have to be
+# re-sorted every time they are shown.
+# each team is stored under the key (-total_points, submit_ranking, join order), so that teams
+# with more points come first, then teams that submitted earlier; the join order keeps ties in the
+# same order as contest.teams.
+class Leaderboard:
+    def __init__(self):
+        self._keys: list[tuple[float, int, int]] = []
+        self._key_of_team: dict[Team, tuple[float, int, int]] = {}
+        self._team_of_order: dict[int, Team] = {}
+        self._join_order = count()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, team: Team, total_points: float):
+        previous_key = self._key_of_team.get(team)
+        join_order = next(self._join_order) if previous_key is None else previous_key[2]
+        key = (-total_points, team.submit_ranking, join_order)
+        if key == previous_key:
+            return
+        if previous_key is not None:
+            del self._keys[bisect_left(self._keys, previous_key)]
+        insort(self._keys, key)
+        self._key_of_team[team] = key
+        self._team_of_order[join_order] = team
+
+    def remove(self, team: Team):
+        key = self._key_of_team.pop(team, None)
+        if key is not None:
+            del self._keys[bisect_left(self._keys, key)]
+            del self._team_of_order[key[2]]
+
+    # replaces every entry at once, with a single sort; teams should be given in contest order.
+    def reset(self, points_of_teams: dict[Team, float]):
+        self._keys = []
+        self._key_of_team = {}
+        self._team_of_order = {}
+        self._join_order = count()
+        for team, total_points in points_of_teams.items():
+            join_order = next(self._join_order)
+            key = (-total_points, team.submit_ranking, join_order)
+            self._keys.append(key)
+            self._key_of_team[team] = key
+            self._team_of_order[join_order] = team
+        self._keys.sort()
+
+    # 1 is the best rank.
+    def rank_of(self, team: Team) -> int:
+        return bisect_left(self._keys, self._key_of_team[team]) + 1
+
+    def top(self, amount: int | None = None, start: int = 0) -> list[Team]:
+        end = len(self._keys) if amount is None else start + amount
+        return [self._team_of_order[key[2]] for key in self._keys[start:end]]
+
+
+# keeps track of the points of every team in a contest, so that they don't have to be
+# recomputed from the team's answers every time the rankings are shown.
+# answering a question only changes the score of one team, and changing a question
+# only changes the scores of the teams that answered it.
+class Scoreboard:
+    def __init__(self, contest_instance: Contest):
+        self.contest_instance = contest_instance
+        # the points each team would get for its current answers, whether or not they have been submitted.
+        self._points: dict[Team, float] = {}
+        self.leaderboard = Leaderboard()
+
+    # answers to questions that were removed give no points.
+    def _question_points(self, question_id: int, answer: float | None) -> float:
+        question = self.contest_instance.get_question_by_id(question_id)
+        if answer is None or question is None:
+            return 0
+        return question.point_value if question.verify(answer) else 0
+
+    def _team_points(self, team: Team) -> float:
+        return sum(
+            self._question_points(question_id, answer)
+            for question_id, answer in team.answers.items()
+        )
+
+    def total_points(self, team: Team) -> float:
+        if not team.answers_submitted:
+            return 0
+        if team in self._points:
+            return self._points[team]
+        # teams that haven't been added to the contest yet aren't tracked.
+        return self._team_points(team)
+
+    def add_team(self, team: Team):
+        self._points[team] = self._team_points(team)
+        self.leaderboard.update(team, self.total_points(team))
+
+    def remove_team(self, team: Team):
+        self._points.pop(team, None)
+        self.leaderboard.remove(team)
+
+    def record_answer(self, team: Team, question: Question, previous_answer: float | None, answer: float):
+        if team in self._points:
+            self._points[team] += (
+                self._question_points(question.id, answer) -
+                self._question_points(question.id, previous_answer)
+            )
+            self.leaderboard.update(team, self.total_points(team))
+
+    # called whenever a team submits its answers, or when they are unsubmitted;
+    # both change its total points and its submit ranking.
+    def record_submission(self, team: Team):
+        if team in self._points:
+            self.leaderboard.update(team, self.total_points(team))
+
+    # the following two are called before and after a question's answer or point value changes,
+    # which removes and then re-adds the points given by that question to every team that answered it.
+    # they are also called before a question is removed from the contest, and after one is added.
+    def remove_question(self, question: Question):
+        self._update_question_points(question, -1)
+
+    def add_question(self, question: Question):
+        self._update_question_points(question, 1)
+
+    def _update_question_points(self, question: Question, sign: int):
+        if self.contest_instance.get_question_by_id(question.id) is not question:
+            return
+        for team in self._points:
+            if question.id in team.answers:
+                self._points[team] += sign * self._question_points(question.id, team.answers[question.id])
+                self.leaderboard.update(team, self.total_points(team))
+
+    # recomputes every score from scratch; used when a contest is loaded.
+    def rebuild(self):
+        self._points = {team: self._team_points(team) for team in self.contest_instance.teams}
+        self._reset_leaderboard()
+
+    # regrades every team in one vectorized pass(see grading.py) and replaces the cached scores with the result.
+    # used after the answer key is fixed, or to audit the scores after a round.
+    def regrade(self) -> GradingResult:
+        # grading needs numpy, which is only imported here so that the rest of the bot runs without it.
+        from grading import grade_contest
+        result = grade_contest(self.contest_instance)
+        self._points = result.raw_points_of_teams()
+        self._reset_leaderboard()
+        return result
+
+    def _reset_leaderboard(self):
+        self.leaderboard.reset({team: self.total_points(team) for team in self._points})
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from array import array
+
 from contestperiod import ContestPeriod
 from exceptions import (
     AnswersAlreadySubmittedException,
@@ -13,22 +15,51 @@ from exceptions import (
 # type checking is happening, which does not occur at runtime
 from typing import TYPE_CHECKING
 
+from packedanswers import PackedAnswers
+
 if TYPE_CHECKING:
     from contest import Contest
     from question import Question
 
 
+# teams use __slots__, and keep their members in arrays of 64 bit ints and their answers in a PackedAnswers,
+# since contests with thousands of teams are kept in memory.
+# member_ids and invited_member_ids never contain duplicates.
 class Team:
+    __slots__ = (
+        "contest_instance", "name", "owner_id", "_channel_id", "submit_ranking", "answers_submitted",
+        "member_ids", "invited_member_ids", "_answers"
+    )
+
     def __init__(self, contest_instance: Contest, name: str, owner_id: int, channel_id: int | None = None):
         self.contest_instance: Contest = contest_instance
         self.name = name
         self.owner_id = owner_id
-        self.channel_id = channel_id
+        # the private channel of the team during the competition; see teamchannels.py.
+        self._channel_id = channel_id
         self.submit_ranking = 0
         self.answers_submitted = False
-        self.member_ids: list[int] = []
-        self.invited_member_ids: list[int] = []
-        self.answers: dict[int, float] = {}
+        self.member_ids = array('q')
+        self.invited_member_ids = array('q')
+        self._answers = PackedAnswers()
+
+    @property
+    def channel_id(self) -> int | None:
+        return self._channel_id
+
+    @channel_id.setter
+    def channel_id(self, channel_id: int | None):
+        if channel_id != self._channel_id:
+            self._channel_id = channel_id
+            self.contest_instance.record_team_event(self, "ChannelChanged", channelID=channel_id)
+
+    @property
+    def answers(self) -> PackedAnswers:
+        return self._answers
+
+    @answers.setter
+    def answers(self, answers: dict[int, float]):
+        self._answers = PackedAnswers(answers)
 
     def member_in_team(self, member_id: int) -> bool:
         return member_id == self.owner_id or member_id in self.member_ids
@@ -39,91 +70,124 @@ class Team:
     def invite_member(self, member_id: int):
         if member_id not in self.member_ids and member_id not in self.invited_member_ids:
             self.invited_member_ids.append(member_id)
+            self.contest_instance.index_invite(member_id, self)
+            self.contest_instance.record_team_event(self, "MemberInvited", memberID=member_id)
 
     def uninvite_member(self, member_id: int):
         if member_id in self.invited_member_ids:
             self.invited_member_ids.remove(member_id)
+            self.contest_instance.unindex_invite(member_id, self)
+            self.contest_instance.record_team_event(self, "MemberUninvited", memberID=member_id)
 
     def register_member(self, member_id: int, ignore_invite: bool = False):
         if member_id not in self.invited_member_ids and not ignore_invite:
             raise MemberNotInvitedException
-        if member_id in self.contest_instance.registered_member_ids:
+        if self.contest_instance.get_team_of_user(member_id) is not None:
             raise MemberInAnotherTeamException
-        if self.contest_instance.team_size_limit and len(self.member_ids) > self.contest_instance.team_size_limit:
+        # the owner and the members, with the new member.
+        if self.contest_instance.exceeds_team_size_limit(len(self.member_ids) + 2):
             raise TeamSizeExceededException
         if not ignore_invite:
-            self.invited_member_ids.remove(member_id)
+            self.uninvite_member(member_id)
         self.member_ids.append(member_id)
+        self.contest_instance.index_member(member_id, self)
+        self.contest_instance.record_team_event(self, "MemberJoined", memberID=member_id)
 
     def remove_member(self, member_id: int):
         if member_id in self.member_ids:
             self.member_ids.remove(member_id)
+            self.contest_instance.unindex_member(member_id, self)
+            self.contest_instance.record_team_event(self, "MemberLeft", memberID=member_id)
         elif member_id in self.invited_member_ids:
-            self.invited_member_ids.remove(member_id)
+            self.uninvite_member(member_id)
         elif member_id == self.owner_id:
             raise OwnerLeaveTeamException
 
-    def answer(self, question: Question, answer: float):
+    # member_id is who answered; it's only used to keep a history of the answers.
+    def answer(self, question: Question, answer: float, member_id: int | None = None):
         if self.contest_instance.period != ContestPeriod.competition:
             raise WrongPeriodException(ContestPeriod.competition)
         if self.answers_submitted:
             raise AnswersAlreadySubmittedException
-        self.answers[question.number] = answer
+        previous_answer = self.answers.get(question.id)
+        self.answers[question.id] = answer
+        self.contest_instance.scoreboard.record_answer(self, question, previous_answer, answer)
+        self.contest_instance.record_team_event(
+            self, "AnswerRecorded", question=question.id, answer=answer, memberID=member_id)
+
+    # answers several questions at once; either every answer is recorded, or(if the team can't answer) none are.
+    def answer_many(self, answers: list[tuple[Question, float]], member_id: int | None = None):
+        if self.contest_instance.period != ContestPeriod.competition:
+            raise WrongPeriodException(ContestPeriod.competition)
+        if self.answers_submitted:
+            raise AnswersAlreadySubmittedException
+        for question, answer in answers:
+            self.answer(question, answer, member_id)
 
     def submit_answers(self):
         if self.contest_instance.period == ContestPeriod.competition:
             self.answers_submitted = True
             self.submit_ranking = self.contest_instance.team_submit_order
             self.contest_instance.team_submit_order += 1
+            self.contest_instance.scoreboard.record_submission(self)
+            self.contest_instance.record_team_event(self, "AnswersSubmitted", submitRanking=self.submit_ranking)
         else:
             raise WrongPeriodException(ContestPeriod.competition)
 
+    def unsubmit_answers(self):
+        self.answers_submitted = False
+        self.submit_ranking = 0
+        self.contest_instance.scoreboard.record_submission(self)
+        self.contest_instance.record_team_event(self, "AnswersUnsubmitted")
+
+    # the set of people in the team stays the same, so the contest's member index needs no update.
     def transfer_ownership(self, new_owner_id: int):
         if new_owner_id in self.member_ids:
             self.member_ids.append(self.owner_id)
             self.member_ids.remove(new_owner_id)
             self.owner_id = new_owner_id
+            self.contest_instance.record_team_event(self, "OwnershipTransferred", newOwnerID=new_owner_id)
         else:
             raise MemberNotInTeamException
 
     def answering_status(self, display_correct_answer: bool = False) -> str:
+        answered_questions = [
+            (question, answer) for question_id, answer in self.answers.items()
+            if (question := self.contest_instance.get_question_by_id(question_id)) is not None
+        ]
+        answered_questions.sort(key=lambda question_and_answer: question_and_answer[0].number)
         strings: list[str] = []
-        for question_num, answer in self.answers.items():
-            status = "Question " + str(question_num) + ": Answered as " + str(answer)
+        for question, answer in answered_questions:
+            status = "Question " + str(question.number) + ": Answered as " + str(answer)
             if display_correct_answer:
-                status += ", Actual Answer: " + str(self.contest_instance.get_question(question_num).correct_answer)
+                status += ", Actual Answer: " + str(question.correct_answer)
             strings.append(status)
         return "\n".join(strings)
 
     @property
     def total_points(self) -> int:
-        if not self.answers_submitted:
-            return 0
-        total = 0
-        for problem_num, solution in self.answers.items():
-            question = self.contest_instance.get_question(problem_num)
-            if question.verify(solution):
-                total += question.point_value
-        return total
+        return self.contest_instance.scoreboard.total_points(self)
 
     @property
     def data(self):
         return {
             "name": self.name,
             "ownerID": self.owner_id,
-            "memberIDs": self.member_ids,
-            "invitedMemberIDs": self.invited_member_ids,
-            "answers": self.answers,
+            "memberIDs": list(self.member_ids),
+            "invitedMemberIDs": list(self.invited_member_ids),
+            "answers": self.answers.to_dict(),
             "answersSubmitted": self.answers_submitted,
-            "submitRanking": self.submit_ranking
+            "submitRanking": self.submit_ranking,
+            "channelID": self.channel_id
         }
 
     @staticmethod
     def from_data(contest_instance, data: dict):
-        team = Team(contest_instance, data["name"], data["ownerID"])
+        # files from before channels were saved have no channel ids.
+        team = Team(contest_instance, data["name"], data["ownerID"], data.get("channelID"))
         team.answers_submitted = data["answersSubmitted"]
-        team.member_ids = data["memberIDs"]
-        team.invited_member_ids = data["invitedMemberIDs"]
+        team.member_ids = array('q', data["memberIDs"])
+        team.invited_member_ids = array('q', data["invitedMemberIDs"])
         team.answers = data["answers"]
         team.submit_ranking = data['submitRanking']
         return team
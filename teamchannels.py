@@ -0,0 +1,210 @@
+import re
+from functools import partial
+
+import discord
+
+from bulkexecutor import BulkAction, BulkExecutor, BulkResult
+from contestrepository import ContestRepository
+
+CONTESTANT_ROLE_NAME = "DSMC Contestant"
+STAFF_ROLE_NAMES = ("Olympiad Team", "Olympiad Manager")
+
+
+def channel_name_of_team(team_name: str) -> str:
+    return normalize_channel_name(team_name + '-contest-channel')
+
+
+# the name discord gives a text channel: lowercased, with spaces turned into dashes and most punctuation
+# (e.g. apostrophes) removed. also used on the names of existing channels, so that they always compare equal.
+def normalize_channel_name(name: str) -> str:
+    name = re.sub(r"\s+", "-", name.lower())
+    return re.sub(r"-{2,}", "-", re.sub(r"[^\w-]", "", name)).strip("-")
+
+
+# what a bulk channel operation did; see open_team_channels and close_team_channels.
+class ChannelReport:
+    def __init__(self):
+        self.result = BulkResult()
+        self.missing_member_ids: list[int] = []
+        # teams whose channel already existed(from an earlier run), so nothing had to be done for them.
+        self.already_done = 0
+        # channels that were found by name in the category, and reused instead of created again.
+        self.reused_channels = 0
+
+
+# a checkpoint: records the channel of a team as soon as it is created(or deleted), so that
+# if the operation fails halfway, running it again only does the remaining work.
+# returns False if the team doesn't exist anymore(e.g. it unregistered in the meantime).
+async def _record_channel(contests: ContestRepository, contest_name: str, team_name: str,
+                          channel_id: int | None) -> bool:
+    async with contests.unit_of_work(contest_name) as contest:
+        if not contest.team_name_taken(team_name):
+            return False
+        contest.get_team(team_name).channel_id = channel_id
+        return True
+
+
+# only the staff can see a hidden channel; see the visible argument of open_team_channels.
+def _team_overwrites(guild: discord.Guild, member_ids, visible: bool) -> dict:
+    overwrites = {guild.default_role: discord.PermissionOverwrite(read_messages=False)}
+    for role_name in STAFF_ROLE_NAMES:
+        overwrites[discord.utils.get(guild.roles, name=role_name)] = discord.PermissionOverwrite(read_messages=True)
+    if visible:
+        for member_id in member_ids:
+            member = guild.get_member(member_id)
+            if member is not None:
+                overwrites[member] = discord.PermissionOverwrite(read_messages=True)
+    return overwrites
+
+
+# an action that lets every member of a team see its channel, or None if they all can already.
+def _show_action(guild: discord.Guild, channel: discord.abc.GuildChannel, member_ids) -> BulkAction | None:
+    members = [member for member in map(guild.get_member, member_ids) if member is not None]
+    if all(channel.overwrites_for(member).read_messages for member in members):
+        return None
+    return BulkAction(
+        "edit_channel", partial(channel.edit, overwrites=_team_overwrites(guild, member_ids, True)),
+        f"showing {channel.name}")
+
+
+def _role_actions(guild: discord.Guild, member_ids, report: ChannelReport) -> list[BulkAction]:
+    contestant_role = discord.utils.get(guild.roles, name=CONTESTANT_ROLE_NAME)
+    actions: list[BulkAction] = []
+    for member_id in member_ids:
+        member = guild.get_member(member_id)
+        if member is None:
+            report.missing_member_ids.append(member_id)
+        # members that already have the role(e.g. from an earlier run) are skipped.
+        elif contestant_role not in member.roles:
+            actions.append(BulkAction(
+                "add_roles", partial(member.add_roles, contestant_role), f"giving {member.display_name} the role"))
+    return actions
+
+
+# gives every registered member of the contest the contestant role.
+async def assign_contestant_roles(contests: ContestRepository, contest_name: str, guild: discord.Guild,
+                                  executor: BulkExecutor, progress=None) -> ChannelReport:
+    contest = await contests.get(contest_name)
+    report = ChannelReport()
+    actions = _role_actions(guild, contest.registered_member_ids, report)
+    report.result = await executor.run(actions, progress)
+    return report
+
+
+# creates a private channel for every team of the contest(in category), and gives every member the contestant role.
+# teams that already have a channel are skipped, and channels that already exist in the category under the
+# team's channel name are reused; so this can safely be run again after it failed halfway.
+# if visible is False, the channels are created hidden from the teams(and no roles are given), so that they can
+# be created ahead of time and shown all at once with reveal_team_channels(see scheduler.py). if it's True,
+# channels that already exist(e.g. ones that were created hidden) are shown to their teams as well.
+async def open_team_channels(contests: ContestRepository, contest_name: str, guild: discord.Guild,
+                             category: discord.CategoryChannel, executor: BulkExecutor,
+                             progress=None, visible: bool = True) -> ChannelReport:
+    contest = await contests.get(contest_name)
+    existing_channels = {normalize_channel_name(channel.name): channel for channel in category.text_channels}
+    report = ChannelReport()
+    actions: list[BulkAction] = []
+    reused_channels: dict[str, int] = {}
+    # different team names can make the same channel name(e.g. "A B" and "A-B"), so a channel is never
+    # reused for a team if another team already has it.
+    claimed_channel_ids = {team.channel_id for team in contest.teams if team.channel_id is not None}
+
+    async def create_channel(team_name: str, overwrites: dict) -> discord.TextChannel | None:
+        channel = await guild.create_text_channel(
+            channel_name_of_team(team_name), overwrites=overwrites, category=category)
+        if not await _record_channel(contests, contest_name, team_name, channel.id):
+            # nothing would ever delete the channel of a team that's gone.
+            await channel.delete()
+            return None
+        return channel
+
+    for team in list(contest.teams):
+        team_member_ids = (team.owner_id, *team.member_ids)
+        if visible:
+            actions += _role_actions(guild, team_member_ids, report)
+        channel = guild.get_channel(team.channel_id) if team.channel_id is not None else None
+        if channel is not None:
+            report.already_done += 1
+        else:
+            channel = existing_channels.get(channel_name_of_team(team.name))
+            if channel is not None and channel.id not in claimed_channel_ids:
+                reused_channels[team.name] = channel.id
+                claimed_channel_ids.add(channel.id)
+            else:
+                channel = None
+        if channel is not None:
+            if visible and (show_action := _show_action(guild, channel, team_member_ids)) is not None:
+                actions.append(show_action)
+            continue
+        overwrites = _team_overwrites(guild, team_member_ids, visible)
+        actions.append(BulkAction(
+            "create_text_channel", partial(create_channel, team.name, overwrites),
+            f"creating the channel of {team.name}"))
+    if reused_channels:
+        async with contests.unit_of_work(contest_name) as contest:
+            for team_name, channel_id in reused_channels.items():
+                if contest.team_name_taken(team_name):
+                    contest.get_team(team_name).channel_id = channel_id
+        report.reused_channels = len(reused_channels)
+    report.result = await executor.run(actions, progress)
+    await contests.flush(contest_name)
+    return report
+
+
+# shows every team its channel(which open_team_channels may have created hidden),
+# and gives every member the contestant role. channels that are already visible are skipped.
+async def reveal_team_channels(contests: ContestRepository, contest_name: str, guild: discord.Guild,
+                               executor: BulkExecutor, progress=None) -> ChannelReport:
+    contest = await contests.get(contest_name)
+    report = ChannelReport()
+    actions: list[BulkAction] = []
+    for team in list(contest.teams):
+        team_member_ids = (team.owner_id, *team.member_ids)
+        actions += _role_actions(guild, team_member_ids, report)
+        channel = guild.get_channel(team.channel_id) if team.channel_id is not None else None
+        if channel is not None and (show_action := _show_action(guild, channel, team_member_ids)) is not None:
+            actions.append(show_action)
+    report.result = await executor.run(actions, progress)
+    return report
+
+
+# deletes the channel of every team, forgetting each one as soon as it's deleted.
+# channels that were already deleted(by hand, or by an earlier run) are simply forgotten.
+async def close_team_channels(contests: ContestRepository, contest_name: str, guild: discord.Guild,
+                              executor: BulkExecutor, progress=None) -> ChannelReport:
+    contest = await contests.get(contest_name)
+    report = ChannelReport()
+    actions: list[BulkAction] = []
+
+    async def delete_channel(team_name: str, channel: discord.abc.GuildChannel):
+        await channel.delete()
+        await _record_channel(contests, contest_name, team_name, None)
+
+    for team in list(contest.teams):
+        if team.channel_id is None:
+            continue
+        channel = guild.get_channel(team.channel_id)
+        if channel is None:
+            await _record_channel(contests, contest_name, team.name, None)
+            report.already_done += 1
+        else:
+            actions.append(BulkAction(
+                "delete_channel", partial(delete_channel, team.name, channel), f"deleting {channel.name}"))
+    report.result = await executor.run(actions, progress)
+    await contests.flush(contest_name)
+    return report
+
+
+# deletes channels that don't belong to any team of the contest anymore(e.g. ones created hidden ahead of time
+# for a team that unregistered before the contest started). returns the ids of the channels still left.
+async def delete_orphaned_channels(contests: ContestRepository, contest_name: str, guild: discord.Guild,
+                                   channel_ids: list[int], executor: BulkExecutor) -> list[int]:
+    contest = await contests.get(contest_name)
+    team_channel_ids = {team.channel_id for team in contest.teams}
+    orphaned_channels = [
+        channel for channel in map(guild.get_channel, set(channel_ids) - team_channel_ids) if channel is not None]
+    result = await executor.run([
+        BulkAction("delete_channel", channel.delete, f"deleting {channel.name}") for channel in orphaned_channels])
+    deleted_ids = {orphaned_channels[index].id for index in result.results}
+    return [channel_id for channel_id in channel_ids
+            if channel_id in team_channel_ids or (channel_id not in deleted_ids and guild.get_channel(channel_id))]
@@ -0,0 +1,46 @@
+import csv
+import io
+import re
+
+from exceptions import TeamImportException
+
+# member ids can be written as plain ids, or as mentions(<@id> or <@!id>).
+_MEMBER_ID_PATTERN = re.compile(r"<@!?(\d+)>|(\d+)")
+
+
+def _parse_member_id(text: str) -> int | None:
+    match = _MEMBER_ID_PATTERN.fullmatch(text.strip())
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+# reads a csv roster with one team per row: "team name, owner id, member id, member id, ...".
+# a header row is skipped if there is one. every problem is collected before raising,
+# so that they can all be fixed at once.
+def parse_team_roster(text: str) -> list[tuple[str, int, list[int]]]:
+    teams: list[tuple[str, int, list[int]]] = []
+    problems: list[str] = []
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    for row_number, row in enumerate(rows, start=1):
+        cells = [cell.strip() for cell in row]
+        team_name, member_cells = cells[0], [cell for cell in cells[1:] if cell]
+        if row_number == 1 and member_cells and _parse_member_id(member_cells[0]) is None:
+            continue
+        if not team_name:
+            problems.append(f"row {row_number} has no team name")
+            continue
+        if not member_cells:
+            problems.append(f"'{team_name}' (row {row_number}) has no owner")
+            continue
+        member_ids = [_parse_member_id(cell) for cell in member_cells]
+        for cell, member_id in zip(member_cells, member_ids):
+            if member_id is None:
+                problems.append(f"'{cell}' (row {row_number}) is not a member id")
+        if None not in member_ids:
+            teams.append((team_name, member_ids[0], member_ids[1:]))
+    if not teams and not problems:
+        problems.append("there are no teams in it")
+    if problems:
+        raise TeamImportException(*problems)
+    return teams